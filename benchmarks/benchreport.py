@@ -0,0 +1,179 @@
+import sys
+import os
+import glob
+import argparse
+import datetime
+import io
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import testreport as tr
+import makereports
+
+stages = ['discovery', 'parsing', 'analysis', 'table', 'rendering',
+          'plotting', 'startup', 'single', 'total']
+
+def best_time(func, repeats):
+    # minimum run time of func and its last return value:
+    times = []
+    for k in range(repeats):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+def run_script(args):
+    script = os.path.join(os.path.dirname(tr.__file__), 'testreport.py')
+    subprocess.run([sys.executable, script] + args, check=True,
+                   stdout=subprocess.DEVNULL)
+
+def benchmark(directory, repeats, plots=True):
+    # run times of the stages of testreport.py on all files in directory:
+    analysis = dict(init=10, outlier=0.0)
+    times = {}
+
+    def discover():
+        files = sorted(glob.glob(os.path.join(directory, 'latencies-*')))
+        for filename in files:
+            os.stat(filename)
+        return files
+    times['discovery'], files = best_time(discover, repeats)
+
+    times['parsing'], reports = best_time(
+        lambda: [tr.parse_report(f) for f in files], repeats)
+
+    times['analysis'], reports = best_time(
+        lambda: [tr.analyze_report(r, **analysis) for r in reports], repeats)
+
+    def build_table():
+        dt, add_data = tr.setup_table([])
+        for report in reports:
+            tr.add_report(dt, report, add_data)
+        return dt
+    times['table'], dt = best_time(build_table, repeats)
+
+    def render():
+        for table_format in tr.DataTable.formats:
+            tr.write_table(dt, io.StringIO(), [], [], [], table_format,
+                           'row', None, '-')
+    times['rendering'], result = best_time(render, repeats)
+
+    if plots:
+        plotdir = tempfile.mkdtemp(prefix='benchreport-')
+        def plot():
+            curves = [(os.path.basename(r.filename), tr.plot_histograms(r.data))
+                      for r in reports]
+            tr.plot_reports(curves, os.path.join(plotdir, 'latencies.png'))
+        try:
+            times['plotting'], result = best_time(plot, repeats)
+        except ImportError:
+            print('matplotlib not available, plotting is not benchmarked')
+        shutil.rmtree(plotdir, ignore_errors=True)
+
+    # start up of the script and a full run without cache:
+    times['startup'], result = best_time(lambda: run_script(['--version']), repeats)
+    # a single report without plots:
+    if len(files) > 0:
+        times['single'], result = best_time(
+            lambda: run_script(['--no-cache', files[0]]), repeats)
+    times['total'], result = best_time(
+        lambda: run_script(['--no-cache', directory]), repeats)
+    return times, len(files)
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=os.path.dirname(os.path.abspath(tr.__file__)),
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def load_results(filename):
+    results = []
+    try:
+        with open(filename) as rf:
+            for line in rf:
+                if line.strip():
+                    results.append(json.loads(line))
+    except OSError:
+        pass
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the stages of testreport.py on synthetic test reports.')
+    parser.add_argument('-n', default=20, type=int, metavar='FILES', dest='files',
+                        help='number of generated report files (defaults to %(default)s)')
+    parser.add_argument('-s', default=6000, type=int, metavar='SAMPLES', dest='samples',
+                        help='number of lines of each latency test (defaults to %(default)s)')
+    parser.add_argument('-r', default=3, type=int, metavar='N', dest='repeats',
+                        help='run each stage %(metavar)s times and report the fastest run (defaults to %(default)s)')
+    parser.add_argument('-d', default=None, metavar='DIR', dest='directory',
+                        help='benchmark the latencies-* files in %(metavar)s instead of generated ones')
+    parser.add_argument('-g', default=True, action='store_false', dest='plots',
+                        help='do not benchmark plotting')
+    parser.add_argument('--budget', default=None, type=float, metavar='MS', dest='budget',
+                        help='exit with 1 if a run on a single report takes longer than %(metavar)s milliseconds')
+    parser.add_argument('--results', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.jsonl'),
+                        metavar='FILE', dest='results',
+                        help='file to which the results are appended (defaults to %(default)s)')
+    parser.add_argument('--no-save', default=True, action='store_false', dest='save',
+                        help='do not store the results')
+    args = parser.parse_args()
+
+    directory = args.directory
+    tmpdir = None
+    if directory is None:
+        tmpdir = tempfile.mkdtemp(prefix='benchreport-')
+        directory = tmpdir
+        makereports.write_reports(directory, args.files, args.samples)
+    try:
+        times, nfiles = benchmark(directory, args.repeats, args.plots)
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    size = dict(files=nfiles, samples=args.samples if args.directory is None else None,
+                directory=os.path.abspath(args.directory) if args.directory else None)
+    result = dict(date=datetime.datetime.now().isoformat(timespec='seconds'),
+                  revision=git_revision(), host=platform.node(),
+                  python=platform.python_version(), numpy=np.__version__,
+                  size=size, times=times)
+
+    # compare with the previous run of the same size on this host:
+    previous = [r for r in load_results(args.results)
+                if r['host'] == result['host'] and r['size'] == size]
+    last = previous[-1] if len(previous) > 0 else None
+    print('%-10s  %10s  %10s  %s' % ('stage', 'time/ms', 'previous', 'ratio'))
+    for stage in stages:
+        if stage not in times:
+            continue
+        line = '%-10s  %10.1f' % (stage, 1000.0*times[stage])
+        if last is not None and stage in last['times']:
+            ratio = times[stage]/last['times'][stage]
+            line += '  %10.1f  %5.2f' % (1000.0*last['times'][stage], ratio)
+            # ignore differences below a millisecond:
+            if ratio > 1.2 and times[stage] - last['times'][stage] > 0.001:
+                line += '  slower'
+        print(line)
+    if last is not None:
+        print('previous run: %s (%s)' % (last['date'], last['revision']))
+    if args.save:
+        with open(args.results, 'a') as rf:
+            rf.write(json.dumps(result) + '\n')
+    if args.budget is not None and 'single' in times and \
+       1000.0*times['single'] > args.budget:
+        print('single report takes %.1f ms, more than the startup budget of %.1f ms'
+              % (1000.0*times['single'], args.budget))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
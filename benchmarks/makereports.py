@@ -0,0 +1,297 @@
+import sys
+import os
+import argparse
+import datetime
+import numpy as np
+
+testmodes = ['kern', 'kthreads', 'user']
+switch_names = ['SUSP/RES', 'SEM SIG/WAIT', 'RPC/RCV-RET']
+kernel_params = ['plain', 'idlepoll', 'idlepoll-isolcpus', 'nohzoff',
+                 'tscreliable', 'highresoff', 'nosmt-idlepoll']
+load_names = ['idle', 'c', 'ci', 'cimn', 'cimns']
+
+def latency_test(rng, n, scale):
+    # rows of the RTAI latency test and the jitter used by test_save:
+    latmin = rng.integers(-2000, 200, n)
+    jitter = rng.lognormal(np.log(scale), 0.5, n).astype(np.int64)
+    # occasional long latencies:
+    spikes = rng.random(n) < 0.0005
+    jitter[spikes] += rng.integers(5000, 40000, np.sum(spikes))
+    latmax = latmin + jitter
+    latavg = latmin + jitter//10
+    ovlmin = np.minimum.accumulate(latmin)
+    ovlmax = np.maximum.accumulate(latmax)
+    overruns = np.cumsum(rng.random(n) < 0.0001)
+    lines = ['RTAI Testsuite - KERNEL latency (all data in nanoseconds)\n',
+             'RTH|%11s|%11s|%11s|%11s|%11s|%11s\n' %
+             ('lat min', 'ovl min', 'lat avg', 'lat max', 'ovl max', 'overruns')]
+    for row in zip(latmin, ovlmin, latavg, latmax, ovlmax, overruns):
+        lines.append('RTD|%11d|%11d|%11d|%11d|%11d|%11d\n' % row)
+    return lines, latmax - latmin, overruns
+
+def switches_test(rng, date):
+    # kernel messages of the RTAI switches test:
+    lines = []
+    stamp = 100.0 + 100.0*rng.random()
+    host = 'kernel: [%12.6f]' % stamp
+    lines.append('%s %s \n' % (date, host))
+    lines.append('%s %s Wait for it ...\n' % (date, host))
+    times = rng.integers(100, 400, 3)
+    for k, (name, t) in enumerate(zip(switch_names, times)):
+        lines.append('%s %s \n' % (date, host))
+        lines.append('%s %s FOR 10 TASKS: TIME %d (ms), %s SWITCHES 40000, SWITCH TIME (INCLUDING FULL FP SUPPORT) %d (ns)\n' %
+                     (date, host, 5 + k, name, t))
+    return lines, times
+
+def preempt_test(rng, n, scale):
+    # rows of the RTAI preempt test:
+    latmin = rng.integers(-2000, 200, n)
+    latmax = latmin + rng.lognormal(np.log(2*scale), 0.5, n).astype(np.int64)
+    latavg = latmin + (latmax - latmin)//10
+    jitfast = rng.lognormal(np.log(2*scale), 0.3, n).astype(np.int64)
+    jitslow = rng.lognormal(np.log(2*scale), 0.3, n).astype(np.int64)
+    lines = ['RTAI Testsuite - KERNEL preempt (all data in nanoseconds)\n',
+             'RTH|%12s|%12s|%12s|%12s|%12s\n' %
+             ('lat min', 'lat avg', 'lat max', 'jit fast', 'jit slow')]
+    for row in zip(latmin, latavg, latmax, jitfast, jitslow):
+        lines.append('RTD|%12d|%12d|%12d|%12d|%12d\n' % row)
+    return lines, (latmax[-1] - latmin[-1], jitfast[-1], jitslow[-1])
+
+def warmup_line(n):
+    # first line used by test_result and test_save:
+    if n < 20:
+        return 1
+    if n < 60:
+        return 10
+    return 20
+
+def test_quality(jitter, overruns):
+    # quality of a test as computed by test_result:
+    n = len(jitter)
+    if n < 1:
+        return 'failed'
+    line = warmup_line(n)
+    maxjitter = np.max(jitter[line-1:]) if n >= line else 0
+    overruns = overruns[-1] - overruns[line-1] if n > line else 0
+    if overruns > 0:
+        return 'failed'
+    if maxjitter > 20000:
+        return 'bad'
+    if maxjitter > 10000:
+        return 'ok'
+    if maxjitter > 2000:
+        return 'good'
+    return 'perfect'
+
+def summary(name, report, progress, results):
+    # RTH/RTD summary as written by test_save:
+    lines = ['Test summary (in nanoseconds):\n', '\n']
+    s = 'RTH| %-50s| ' % 'general'
+    for td in testmodes:
+        s += '%-41s| %-19s| %-31s| ' % (td + ' latencies', td + ' switches', td + ' preempt')
+    lines.append(s + 'kernel\n')
+    s = 'RTH| %-40s| %-8s| ' % ('description', 'progress')
+    for td in testmodes:
+        s += '%7s| %7s| %7s| %5s| %7s| %5s| %5s| %5s| %9s| %9s| %9s| ' % \
+            ('ovlmax', 'avgmax', 'std', 'n', 'maxover', 'susp', 'sem', 'rpc',
+             'max', 'jitfast', 'jitslow')
+    lines.append(s + 'configuration\n')
+    s = 'RTD| %-40s| %-8s| ' % (name, progress)
+    for td in testmodes:
+        if td in results:
+            jitter, overruns, switches, preempt = results[td]
+            line = warmup_line(len(jitter))
+            d = jitter[line-1:]
+            s += '%7.0f| %7.0f| %7.0f| %5d| %7d| ' % \
+                (np.max(d), np.mean(d), np.sqrt(np.mean(d*d) - np.mean(d)**2),
+                 len(d), np.max(overruns[line-1:]) - overruns[line-1])
+            s += '%5.0f| %5.0f| %5.0f| ' % tuple(switches)
+            s += '%9.0f| %9.0f| %9.0f| ' % tuple(preempt)
+        else:
+            s += '%7s| %7s| %7s| %5s| %7s| ' % ('-', '-', '-', '-', '-')
+            s += '%5s| %5s| %5s| ' % ('-', '-', '-')
+            s += '%9s| %9s| %9s| ' % ('-', '-', '-')
+    lines.append(s + 'config-' + report + '\n')
+    lines.append('\n')
+    return lines
+
+def kernel_info(rng, host, kernel, param, cpu, ncpus, governor):
+    # output of print_kernel_info:
+    lines = ['\n', 'Loaded modules (lsmod):\n',
+             '  Module                  Size  Used by\n']
+    for k in range(40):
+        lines.append('  %-22s %7d  %d \n' % ('module%02d' % k, 4096*rng.integers(2, 200), k % 3))
+    lines.append('\n')
+    lines.append('Interrupts (/proc/interrupts):\n')
+    lines.append('        ' + ''.join('   CPU%-7d' % c for c in range(ncpus)) + '\n')
+    for irq in range(30):
+        counts = rng.integers(0, 100000, ncpus)
+        counts[cpu] = 0
+        lines.append('  %3d:' % irq + ''.join(' %10d' % c for c in counts) +
+                     '   IO-APIC   %d-edge      dev%d\n' % (irq, irq))
+    lines.append('  LOC:' + ''.join(' %10d' % c for c in rng.integers(600000, 700000, ncpus)) +
+                 '   Local timer interrupts\n')
+    lines.append('\n')
+    lines.append('Distribution (lsb_release -a):\n')
+    lines.append('  Distributor ID : Ubuntu\n  Description    : Ubuntu 16.04.4 LTS\n')
+    lines.append('  Release        : 16.04\n  Codename       : xenial\n\n')
+    lines.append('Hostname: %s\n\n' % host)
+    lines.append('Running kernel (uname -r): %s\n\n' % kernel)
+    lines.append('Kernel parameter (/proc/cmdline):\n')
+    lines.append('  BOOT_IMAGE=/boot/vmlinuz-%s\n  root=UUID=1234\n  ro\n' % kernel)
+    if 'idlepoll' in param:
+        lines.append('  idle=poll\n')
+    if 'isolcpus' in param:
+        lines.append('  isolcpus=%d\n' % cpu)
+    if 'nohzoff' in param:
+        lines.append('  nohz=off\n')
+    if 'tscreliable' in param:
+        lines.append('  tsc=reliable\n')
+    if 'highresoff' in param:
+        lines.append('  highres=off\n')
+    if 'nosmt' in param:
+        lines.append('  nosmt\n')
+    lines.append('\n')
+    freqs = 3.4 - 0.1*rng.random(ncpus)
+    lines.append('Environment:\n')
+    lines.append('  tests run on cpu    : %d\n' % cpu)
+    lines.append('  cpulatency          : not loaded\n')
+    lines.append('  governor            : %s\n' % governor)
+    lines.append('  cpu frequency       : %.3f GHz\n' % freqs[cpu])
+    lines.append('\n')
+    lines.append('CPU topology, frequencies, and idle states (/sys/devices/system/cpu/*):\n')
+    lines.append('CPU topology                   CPU frequency scaling                CPU idle states (disabled time-fraction%)\n')
+    lines.append('logical  socket  core  online  freq/GHz      governor  transitions  POLL     C1       C3       C6     \n')
+    for c in range(ncpus):
+        idle = rng.dirichlet(np.ones(4))*100.0
+        if 'idlepoll' in param:
+            idle = np.array([100.0, 0.0, 0.0, 0.0])
+        lines.append('  cpu%-2d  %6d  %4d  %6d  %8.3f  %12s  %11s' %
+                     (c, 0, c % (ncpus//2 or 1), 1, freqs[c], governor, 'n.a.') +
+                     ''.join('  %1s %4.1f%%' % (0, p) for p in idle) + '\n')
+    lines.append('\n')
+    lines.append('CPU frequency scaling, idle, and boost (/sys/devices/system/cpu/{cpuidle,cpufreq}):\n')
+    lines.append('  scaling driver : intel_pstate\n  cpuidle driver : intel_idle\n  boost          : no\n\n')
+    lines.append('CPU core temperatures (sensors):\n')
+    for c in range(ncpus):
+        lines.append('  Core %d:         +%.1f°C  (high = +84.0°C, crit = +100.0°C)\n' %
+                     (c, 38.0 + 8.0*rng.random()))
+    lines.append('\n')
+    lines.append('CPU (/proc/cpuinfo):\n')
+    lines.append('  model name        : Intel(R) Core(TM) i5-4570 CPU @ 3.20GHz\n')
+    lines.append('  number of CPUs    : %d\n' % ncpus)
+    lines.append('  max CPU frequency : 3.600 GHz\n  CPU family        : 6\n')
+    lines.append('  machine (uname -m): x86_64\n  memory (free -h)  : 7.7G RAM\n\n')
+    lines.append('Versions:\n  kernel     : %s\n  gcc        : gcc (Ubuntu 5.4.0) 5.4.0 20160609\n\n' %
+                 kernel.split('-')[0])
+    lines.append('Grub menu (/boot/grub/grub.cfg):\n  Ubuntu\n  Advanced options for Ubuntu\n\n')
+    lines.append('Settings of makertaikernel.sh:\n')
+    lines.append('  KERNEL_PARAM         = \n  TEST_TIME_DEFAULT    = 600\n\n')
+    return lines
+
+def write_report(path, rng, samples, preempt, modes, host, rtai, kernel,
+                 num, date, param, load, cpu, ncpus, scale, hardware, dmesg):
+    # a latencies-* file as written by test_save after all tests:
+    governor = 'performance' if 'performance' in param else 'powersave'
+    name = '%s-%s' % (param, load)
+    results = {}
+    tests = []
+    stamp = date.strftime('%b %d %H:%M:%S') + ' ' + host
+    for td in modes:
+        lines, jitter, overruns = latency_test(rng, samples, scale)
+        tests.extend(['%s/latency test:\n' % td] + lines +
+                      ['----------------------------------------\n', '\n', '\n'])
+        lines, switches = switches_test(rng, stamp)
+        tests.extend(['%s/switches test:\n' % td] + lines +
+                      ['----------------------------------------\n', '\n', '\n'])
+        lines, maxima = preempt_test(rng, preempt, scale)
+        tests.extend(['%s/preempt test:\n' % td] + lines +
+                      ['----------------------------------------\n', '\n', '\n'])
+        results[td] = (jitter, overruns, switches, maxima)
+    # the quality of the first test mode is part of the file name:
+    jitter, overruns = results[modes[0]][:2]
+    report = '%s-%s-%s-%03d-%s-%s-%s' % (host, rtai, kernel, num, date.strftime('%Y-%m-%d'),
+                                         name, test_quality(jitter, overruns))
+    progress = 'hsm' + ''.join('t' if td == 'kthreads' else td[0] for td in modes)
+    out = summary(name, report, progress, results)
+    out.append('Date: %s\n' % date.strftime('%Y-%m-%d'))
+    out.append('\n')
+    out.append('Load: %.2f %.2f %.2f\n' % tuple(rng.random(3)*4))
+    for l in load[1:] if load != 'idle' else []:
+        command = dict(c='cpu: stress -c 4', i='io: stress -i 2', m='mem: stress -m 2',
+                       n='net: ping -f localhost', s='snd: not implemented').get(l, l)
+        out.append('  %s\n' % command)
+    out.append('\n')
+    out.extend(tests)
+    out.extend(kernel_info(rng, host, kernel + '-rtai', param, cpu, ncpus, governor))
+    if hardware > 0:
+        out.append('Hardware (lshw):\n')
+        for k in range(hardware):
+            out.append('       *-device:%d\n            description: Device %d\n' % (k, k))
+        out.append('\n')
+    out.append('rtai-info reports:\n  RTAI version: %s\n\n' % rtai)
+    out.append('dmesg:\n')
+    out.append('\n')
+    out.append('[%12.6f] MAKERTAIKERNEL.SH %s TEST %s START\n' % (10.0, kernel, name))
+    for k in range(dmesg):
+        out.append('[%12.6f] RTAI[sched]: loaded (IMMEDIATE, UP, USER/KERNEL SPACE: <with RTAI OWN KTASKs>).\n' %
+                   (10.0 + 0.01*k))
+    out.append('[%12.6f] MAKERTAIKERNEL.SH %s TEST %s DONE\n' % (20.0 + 0.01*dmesg, kernel, name))
+    filename = os.path.join(path, 'latencies-' + report)
+    with open(filename, 'w', encoding='utf-8') as df:
+        df.write(''.join(out))
+    return filename
+
+def write_reports(path, files, samples, preempt=None, modes=testmodes, seed=0,
+                  host='aeshna', rtai='rtai-5.1', kernel='4.4.115',
+                  hardware=200, dmesg=100):
+    # files test reports for a range of kernel parameter and loads:
+    os.makedirs(path, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    if preempt is None:
+        preempt = max(1, samples//10)
+    date = datetime.datetime(2018, 3, 1, 10, 0, 0)
+    filenames = []
+    for k in range(files):
+        param = kernel_params[k % len(kernel_params)]
+        load = load_names[(k//len(kernel_params)) % len(load_names)]
+        ncpus = 4
+        cpu = 1 if 'isolcpus' in param else 0
+        scale = 800.0 if 'idlepoll' in param else 1500.0
+        scale *= 1.0 + 0.3*len(load.replace('idle', ''))
+        filenames.append(write_report(path, rng, samples, preempt, modes, host,
+                                      rtai, kernel, k + 1,
+                                      date + datetime.timedelta(hours=k),
+                                      param, load, cpu, ncpus, scale,
+                                      hardware, dmesg))
+    return filenames
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write synthetic latencies-* test reports as produced by makertaikernel.sh.')
+    parser.add_argument('-n', default=10, type=int, metavar='FILES', dest='files',
+                        help='number of report files (defaults to %(default)s)')
+    parser.add_argument('-s', default=600, type=int, metavar='SAMPLES', dest='samples',
+                        help='number of lines of each latency test (defaults to %(default)s)')
+    parser.add_argument('-p', default=None, type=int, metavar='SAMPLES', dest='preempt',
+                        help='number of lines of each preempt test (defaults to a tenth of the latency test)')
+    parser.add_argument('-t', default=','.join(testmodes), metavar='MODES', dest='modes',
+                        help='comma separated test modes (defaults to %(default)s)')
+    parser.add_argument('--seed', default=0, type=int,
+                        help='seed of the random number generator (defaults to %(default)s)')
+    parser.add_argument('--hardware', default=200, type=int, metavar='LINES',
+                        help='number of devices in the lshw section (defaults to %(default)s)')
+    parser.add_argument('--dmesg', default=100, type=int, metavar='LINES',
+                        help='number of dmesg lines (defaults to %(default)s)')
+    parser.add_argument('directory', help='directory for the report files')
+    args = parser.parse_args()
+    modes = [td for td in args.modes.split(',') if td in testmodes]
+    if len(modes) == 0:
+        print('no valid test mode in "%s"' % args.modes)
+        sys.exit(1)
+    write_reports(args.directory, args.files, args.samples, args.preempt,
+                  modes, args.seed, hardware=args.hardware, dmesg=args.dmesg)
+
+
+if __name__ == '__main__':
+    main()
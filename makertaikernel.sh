@@ -59,6 +59,8 @@
 : ${RTAI_HAL_PARAM:=""}       # parameter for the rtai_hal module used for testing
 : ${RTAI_SCHED_PARAM:=""}     # parameter for the rtai_sched module used for testing
 : ${TEST_TIME_DEFAULT:="600"} # default time in seconds used for latency test
+: ${TEST_STOP:=""}            # stop latency tests as soon as their quality is this
+                              # (failed, bad, ok, good) or worse, empty: run full time
 : ${STARTUP_TIME:=300}        # time to wait after boot to run a batch test in seconds
 : ${COMPILE_TIME:=800}        # time needed for building a kernel with reconfigure
                               # (this is only used for estimating the duration of a test batch)
@@ -941,6 +943,7 @@ function print_settings {
     echo "  BATCH_KERNEL_PARAM   = $BATCH_KERNEL_PARAM"
     echo "  KERNEL_CONFIG_BACKUP = $KERNEL_CONFIG_BACKUP"
     echo "  TEST_TIME_DEFAULT    = $TEST_TIME_DEFAULT"
+    echo "  TEST_STOP            = $TEST_STOP"
     echo "  STARTUP_TIME         = $STARTUP_TIME"
     echo "  COMPILE_TIME         = $COMPILE_TIME"
     echo "  LOCAL_SRC_PATH       = $LOCAL_SRC_PATH"
@@ -1005,6 +1008,10 @@ KERNEL_CONFIG_BACKUP="$KERNEL_CONFIG_BACKUP"
 # Default time in seconds to run the RTAI latency tests:
 TEST_TIME_DEFAULT=$TEST_TIME_DEFAULT
 
+# Stop latency tests as soon as their quality is this or worse
+# (failed, bad, ok, good), leave empty for running the full test time:
+TEST_STOP="$TEST_STOP"
+
 # Time in seconds to wait for starting a test batch after reboot:
 STARTUP_TIME=$STARTUP_TIME
 
@@ -1139,7 +1146,7 @@ function install_packages {
     if $MAKE_COMEDI; then
 	PACKAGES="$PACKAGES bison flex libgsl0-dev libboost-program-options-dev"
     fi
-    OPT_PACKAGES="kernel-package stress lm-sensors lshw openssh-server python python-numpy python-matplotlib python-tk"
+    OPT_PACKAGES="kernel-package stress lm-sensors lshw openssh-server python3 python3-numpy python3-matplotlib python3-tk"
     if $DRYRUN; then
 	echo_log "apt-get -y install $PACKAGES"
 	for PKG in $OPT_PACKAGES; do
@@ -1885,6 +1892,11 @@ function reboot_kernel {
 function test_result {
     TESTMODE="$1"
     TEST_RESULT=""
+    # single pass over the results with testreport.py, awk otherwise:
+    if test -r ${0%/*}/testreport.py && TEST_RESULT=$(python3 ${0%/*}/testreport.py summarize --quality "$TESTMODE" 2> /dev/null); then
+	echo $TEST_RESULT
+	return
+    fi
     if test -n "$TESTMODE" && test -f "results-${TESTMODE}-latency.dat"; then
 	N_DATA=$(grep RTD results-${TESTMODE}-latency.dat | wc -l)
 	if test $N_DATA -lt 1; then
@@ -1926,6 +1938,89 @@ function test_result {
     echo $TEST_RESULT
 }
 
+function test_summary {
+    NAME="$1"
+    REPORT="$2"
+    TESTED="$3"
+    PROGRESS="$4"
+    echo "Test summary (in nanoseconds):"
+    echo
+    # header 1:
+    printf "RTH| %-50s| " "general"
+    for TD in kern kthreads user; do
+	printf "%-41s| %-19s| %-31s| " "$TD latencies" "$TD switches" "$TD preempt"
+    done
+    printf "%s\n" "kernel"
+    # header 2:
+    printf "RTH| %-40s| %-8s| " "description" "progress"
+    for TD in kern kthreads user; do
+	printf "%7s| %7s| %7s| %5s| %7s| %5s| %5s| %5s| %9s| %9s| %9s| " "ovlmax" "avgmax" "std" "n" "maxover" "susp" "sem" "rpc" "max" "jitfast" "jitslow"
+    done
+    printf "%s\n" "configuration"
+    # data:
+    printf "RTD| %-40s| %-8s| " "$NAME" "$PROGRESS"
+    for TD in kern kthreads user; do
+	T=${TD:0:1}
+	test "$TD" = "kthreads" && T="t"
+	TN=latency
+	TEST_RESULTS=results-$TD-$TN.dat
+	if test -f "$TEST_RESULTS"; then
+	    N_DATA=$(grep RTD "$TEST_RESULTS" | wc -l)
+	    LINE=20
+	    test "$N_DATA" -lt 60 && LINE=10
+	    test "$N_DATA" -lt 20 && LINE=1
+	    awk -F '\\|[ ]*' "/RTD/ {
+		nd++
+		if ( nd == $LINE )
+		    ors0=\$7
+		if ( nd >= $LINE ) {
+		    d=\$5-\$2
+		    sum+=d
+		    sumsq+=d*d
+		    n++
+		    if ( maxd<d )
+			maxd=d
+		    if (ors<\$7)
+			ors=\$7
+		} }
+	    END { if ( n > 0 ) {
+		    mean = sum/n
+		    printf( \"%7.0f| %7.0f| %7.0f| %5d| %7d| \", maxd, mean, sqrt(sumsq/n-mean*mean), n, ors-ors0 )
+		} }" "$TEST_RESULTS"
+	elif [[ $TESTED == *${T}* ]]; then
+	    printf "%7s| %7s| %7s| %5s| %7s| " "o" "o" "o" "o" "o"
+	else
+	    printf "%7s| %7s| %7s| %5s| %7s| " "-" "-" "-" "-" "-"
+	fi
+	TN=switches
+	TEST_RESULTS=results-$TD-$TN.dat
+	if test -f "$TEST_RESULTS" && test "$(grep -c 'SWITCH TIME' "$TEST_RESULTS")" -eq 3; then
+	    grep 'SWITCH TIME' "$TEST_RESULTS" | awk '{ printf( "%5.0f| ", $(NF-1) ); }'
+	elif [[ $TESTED == *${T}* ]]; then
+	    printf "%5s| %5s| %5s| " "o" "o" "o"
+	else
+	    printf "%5s| %5s| %5s| " "-" "-" "-"
+	fi
+	TN=preempt
+	TEST_RESULTS=results-$TD-$TN.dat
+	if test -f "$TEST_RESULTS"; then
+	    awk -F '\\|[ ]*' '/RTD/ { 
+		maxd=$4-$2
+		jfast=$5
+		jslow=$6 }
+	    END { 
+		printf( "%9.0f| %9.0f| %9.0f| ", maxd, jfast, jslow ) 
+	    }' "$TEST_RESULTS"
+	elif [[ $TESTED == *${T}* ]]; then
+	    printf "%9s| %9s| %9s| " "o" "o" "o"
+	else
+	    printf "%9s| %9s| %9s| " "-" "-" "-"
+	fi
+    done
+    printf "%s\n" "config-$REPORT"
+    echo
+}
+
 function test_save {
     NAME="$1"
     REPORT="$2"
@@ -1936,82 +2031,9 @@ function test_save {
     HARDWARE="$7"
     {
 	# summary analysis of test results:
-	echo "Test summary (in nanoseconds):"
-	echo
-	# header 1:
-	printf "RTH| %-50s| " "general"
-	for TD in kern kthreads user; do
-	    printf "%-41s| %-19s| %-31s| " "$TD latencies" "$TD switches" "$TD preempt"
-	done
-	printf "%s\n" "kernel"
-	# header 2:
-	printf "RTH| %-40s| %-8s| " "description" "progress"
-	for TD in kern kthreads user; do
-	    printf "%7s| %7s| %7s| %5s| %7s| %5s| %5s| %5s| %9s| %9s| %9s| " "ovlmax" "avgmax" "std" "n" "maxover" "susp" "sem" "rpc" "max" "jitfast" "jitslow"
-	done
-	printf "%s\n" "configuration"
-	# data:
-	printf "RTD| %-40s| %-8s| " "$NAME" "$PROGRESS"
-	for TD in kern kthreads user; do
-	    T=${TD:0:1}
-	    test "$TD" = "kthreads" && T="t"
-	    TN=latency
-	    TEST_RESULTS=results-$TD-$TN.dat
-	    if test -f "$TEST_RESULTS"; then
-		N_DATA=$(grep RTD "$TEST_RESULTS" | wc -l)
-		LINE=20
-		test "$N_DATA" -lt 60 && LINE=10
-		test "$N_DATA" -lt 20 && LINE=1
-		awk -F '\\|[ ]*' "/RTD/ {
-                    nd++
-                    if ( nd == $LINE )
-                        ors0=\$7
-                    if ( nd >= $LINE ) {
-                        d=\$5-\$2
-                        sum+=d
-                        sumsq+=d*d
-                        n++
-                        if ( maxd<d )
-                            maxd=d
-                        if (ors<\$7)
-                            ors=\$7
-                    } }
-                END { if ( n > 0 ) {
-                        mean = sum/n
-                        printf( \"%7.0f| %7.0f| %7.0f| %5d| %7d| \", maxd, mean, sqrt(sumsq/n-mean*mean), n, ors-ors0 )
-                    } }" "$TEST_RESULTS"
-	    elif [[ $TESTED == *${T}* ]]; then
-		printf "%7s| %7s| %7s| %5s| %7s| " "o" "o" "o" "o" "o"
-	    else
-		printf "%7s| %7s| %7s| %5s| %7s| " "-" "-" "-" "-" "-"
-	    fi
-	    TN=switches
-	    TEST_RESULTS=results-$TD-$TN.dat
-	    if test -f "$TEST_RESULTS" && test "$(grep -c 'SWITCH TIME' "$TEST_RESULTS")" -eq 3; then
-		grep 'SWITCH TIME' "$TEST_RESULTS" | awk '{ printf( "%5.0f| ", $(NF-1) ); }'
-	    elif [[ $TESTED == *${T}* ]]; then
-		printf "%5s| %5s| %5s| " "o" "o" "o"
-	    else
-		printf "%5s| %5s| %5s| " "-" "-" "-"
-	    fi
-	    TN=preempt
-	    TEST_RESULTS=results-$TD-$TN.dat
-	    if test -f "$TEST_RESULTS"; then
-		awk -F '\\|[ ]*' '/RTD/ { 
-                    maxd=$4-$2
-                    jfast=$5
-                    jslow=$6 }
-                END { 
-                    printf( "%9.0f| %9.0f| %9.0f| ", maxd, jfast, jslow ) 
-                }' "$TEST_RESULTS"
-	    elif [[ $TESTED == *${T}* ]]; then
-		printf "%9s| %9s| %9s| " "o" "o" "o"
-	    else
-		printf "%9s| %9s| %9s| " "-" "-" "-"
-	    fi
-	done
-	printf "%s\n" "config-$REPORT"
-	echo
+	if ! { test -r ${0%/*}/testreport.py && python3 ${0%/*}/testreport.py summarize "$NAME" "$REPORT" "$TESTED" "$PROGRESS" 2> /dev/null; }; then
+	    test_summary "$NAME" "$REPORT" "$TESTED" "$PROGRESS"
+	fi
 	# failed modules:
 	if [[ $TESTED == *h* ]] && [[ $PROGRESS != *h* ]]; then
 	    echo "Failed to load rtai_hal module"
@@ -2080,6 +2102,7 @@ function test_run {
     if test -d $TEST_DIR; then
 	echo_log "running $DIR/$TEST test"
 	echo_kmsg "RUN $DIR/$TEST test"
+	MRK_DIR="$(cd "$(dirname "$0")" && pwd)"
 	cd $TEST_DIR
 	rm -f $TEST_RESULTS
 
@@ -2099,7 +2122,16 @@ function test_run {
 
 	# run the test:
 	trap true SIGINT   # ^C should terminate ./run but not this script
-	$TIMEOUTCMD ./run | tee $TEST_RESULTS
+	# testreport.py is the only reader of the test output with TEST_STOP,
+	# so make sure it runs and accepts TEST_STOP before using it:
+	if test $TEST = latency && test -n "$TEST_STOP" && test -r "$MRK_DIR/testreport.py" && \
+	    python3 "$MRK_DIR/testreport.py" stream --stop "$TEST_STOP" --help > /dev/null 2>&1; then
+	    # interrupt the test as soon as its quality is TEST_STOP or worse:
+	    $TIMEOUTCMD ./run | python3 "$MRK_DIR/testreport.py" stream --stop $TEST_STOP --signal --tee $TEST_RESULTS
+	    test "${PIPESTATUS[1]}" = 3 && echo_log "stopped $DIR/$TEST test early"
+	else
+	    $TIMEOUTCMD ./run | tee $TEST_RESULTS
+	fi
 	#script -c "$TIMEOUTCMD ./run" results.dat
 	trap - SIGINT
 	#sed -e '1d; $d; s/\^C//' results.dat > $TEST_RESULTS
@@ -3196,7 +3228,7 @@ function restore_test_batch {
 
 function test_report {
     if test -r ${0%/*}/testreport.py; then
-	python ${0%/*}/testreport.py ${HIDE_COLUMNS[@]/#/--hide } $@
+	python3 ${0%/*}/testreport.py ${HIDE_COLUMNS[@]/#/--hide } $@
 	return
     fi
     SORT=false
@@ -2,18 +2,36 @@ import sys
 import os
 import glob
 import argparse
+import functools
+import hashlib
+import html
+import io
+import itertools
+import json
+import mmap
+import re
+import struct
+import time
 import math as m
-import numpy as np
-# include this only when needed!
-# matplotlib also needs python-tk package
-import matplotlib.pyplot as plt
+# the summarize and stream subcommands run between and along the tests
+# of makertaikernel.sh and do without numpy for a fast start,
+# as do the help and version options:
+if __name__ != '__main__' or sys.argv[1:2] not in [['summarize'], ['stream'],
+                                                   ['-h'], ['--help'], ['--version']]:
+    import numpy as np
 
 class DataTable:
     formats = ['dat', 'ascii', 'rtai', 'csv', 'md', 'html', 'tex']
     column_numbering = ['num', 'index', 'aa', 'AA']
 
     def __init__(self):
+        # columns are stored in numpy arrays with spare capacity,
+        # only the first lengths[c] elements of data[c] are valid.
+        # numeric columns use NaN for missing values, for string columns
+        # valid[c] marks the values that are not missing.
         self.data = []
+        self.lengths = []
+        self.valid = []
         self.shape = (0, 0)
         self.header = []
         self.nsecs = 0
@@ -23,6 +41,11 @@ class DataTable:
         self.setcol = 0
         self.addcol = 0
         self.indices = None
+        # resolved column paths:
+        self.col_index = {}
+        # formatted values and a counter for changes of the data:
+        self.cells = {}
+        self.version = 0
 
     def add_section(self, label):
         if self.addcol >= len(self.data):
@@ -30,12 +53,15 @@ class DataTable:
             self.units.append('')
             self.formats.append('')
             self.hidden.append(False)
-            self.data.append([])
+            self.data.append(None)
+            self.lengths.append(0)
+            self.valid.append(None)
         else:
             self.header[self.addcol] = [label] + self.header[self.addcol]
         if self.nsecs < len(self.header[self.addcol]):
             self.nsecs = len(self.header[self.addcol])
         self.addcol = len(self.data)-1
+        self.col_index = {}
         self.shape = (self.columns(), self.rows())
         return self.addcol
         
@@ -45,12 +71,15 @@ class DataTable:
             self.formats.append(formats)
             self.units.append(unit)
             self.hidden.append(False)
-            self.data.append([])
+            self.data.append(None)
+            self.lengths.append(0)
+            self.valid.append(None)
         else:
             self.header[self.addcol] = [label] + self.header[self.addcol]
             self.units[self.addcol] = unit
             self.formats[self.addcol] = formats
         self.addcol = len(self.data)
+        self.col_index = {}
         self.shape = (self.columns(), self.rows())
         return self.addcol-1
 
@@ -61,15 +90,28 @@ class DataTable:
     def set_section(self, label, column, level):
         column = self.col(column)
         self.header[column][level] = label
+        self.col_index = {}
         return column
 
     def label(self, column):
         column = self.col(column)
         return self.header[column][0]
 
+    def path(self, column):
+        # sections and label of a column separated by '>':
+        column = self.col(column)
+        path = [self.header[column][0]]
+        for level in range(1, self.nsecs+1):
+            for c in range(column, -1, -1):
+                if len(self.header[c]) > level:
+                    path.insert(0, self.header[c][level])
+                    break
+        return '>'.join(path)
+
     def set_label(self, label, column):
         column = self.col(column)
         self.header[column][0] = label
+        self.col_index = {}
         return column
 
     def unit(self, column):
@@ -94,7 +136,7 @@ class DataTable:
         return len(self.header)
 
     def rows(self):
-        return max(map(len, self.data))
+        return self.shape[1]
         
     def __len__(self):
         return self.columns()
@@ -108,7 +150,7 @@ class DataTable:
         if self.iter_counter >= self.columns():
             raise StopIteration
         else:
-            return self.data[self.iter_counter]
+            return self.values(self.iter_counter)
 
     def next(self):  # python 2
         return self.__next__()
@@ -121,30 +163,68 @@ class DataTable:
         if isinstance(index, slice):
             start = self.col(index.start)
             stop = self.col(index.stop)
-            newindex = slice(start, stop, index.step)
+            newindex = range(self.columns())[slice(start, stop, index.step)]
         elif type(index) is list or type(index) is tuple or type(index) is np.ndarray:
             newindex = [self.col(inx) for inx in index]
-            if type(key) is tuple:
-                return [self.data[i][key[1]] for i in newindex]
-            else:
-                return [self.data[i] for i in newindex]
         else:
             newindex = self.col(index)
+            if type(key) is tuple:
+                return self.values(newindex)[key[1]]
+            else:
+                return self.values(newindex)
         if type(key) is tuple:
-            return self.data[newindex][key[1]]
+            return [self.values(i)[key[1]] for i in newindex]
         else:
-            return self.data[newindex]
-        return None
+            return [self.values(i) for i in newindex]
+
+    def values(self, column):
+        # valid part of the data array of a column:
+        if self.data[column] is None:
+            self._reserve(column, 0)
+        return self.data[column][:self.lengths[column]]
+
+    def is_missing(self, column):
+        # boolean array indicating missing values of a column:
+        values = self.values(column)
+        if self.valid[column] is not None:
+            return ~self.valid[column][:len(values)]
+        return np.isnan(values)
+
+    def _reserve(self, column, rows, width=1):
+        # make sure the arrays of a column can hold rows values
+        # (and strings of length width):
+        col = self.data[column]
+        if col is None:
+            # the type of a column is given by its format:
+            if self.formats[column][-1:] == 's':
+                col = np.zeros(0, dtype='U1')
+                self.valid[column] = np.zeros(0, dtype=bool)
+            else:
+                col = np.zeros(0)
+            self.data[column] = col
+        n = len(col)
+        if rows <= n and (col.dtype.kind != 'U' or width <= col.itemsize//4):
+            return
+        size = max(rows, 2*n, 16) if rows > n else n
+        if col.dtype.kind == 'U':
+            newcol = np.zeros(size, dtype='U%d' % max(width, col.itemsize//4))
+            valid = np.zeros(size, dtype=bool)
+            valid[:n] = self.valid[column]
+            self.valid[column] = valid
+        else:
+            newcol = np.full(size, np.nan)
+        newcol[:n] = col
+        self.data[column] = newcol
 
     def key_value(self, col, row, missing='-'):
         col = self.col(col)
         if col is None:
             return ''
-        if isinstance(self.data[col][row], float) and m.isnan(self.data[col][row]):
+        if self.is_missing(col)[row]:
             v = missing
         else:
             u = self.units[col] if self.units[col] != '1' else ''
-            v = (self.formats[col] % self.data[col][row]) + u
+            v = (self.formats[col] % self.values(col)[row]) + u
         return self.header[col][0] + '=' + v
 
     def _find_col(self, ss, si, minns, maxns, c0, strict=True):
@@ -178,6 +258,8 @@ class DataTable:
         # column: int or str or None
         if column is None:
             return None, None
+        if column in self.col_index:
+            return self.col_index[column]
         if not isinstance(column, int) and column.isdigit():
             column = int(column)
         if isinstance(column, int):
@@ -197,6 +279,7 @@ class DataTable:
         c0, c1, ns, si = self._find_col(ss, si0, 0, maxns, 0, True)
         if c0 is None and c1 is not None:
             c0, c1, ns, si = self._find_col(ss, si, ns, maxns, c1, False)
+        self.col_index[column] = (c0, c1)
         return c0, c1
     
     def col(self, column):
@@ -211,15 +294,47 @@ class DataTable:
         column = self.col(column)
         if column is None:
             column = self.setcol
-        self.data[column].append(val)
+        n = self.lengths[column]
+        self._reserve(column, n+1)
+        if isinstance(val, float) and m.isnan(val):
+            # missing values are already in place
+            pass
+        elif self.valid[column] is not None:
+            val = str(val)
+            self._reserve(column, n+1, len(val))
+            self.data[column][n] = val
+            self.valid[column][n] = True
+        else:
+            self.data[column][n] = val
+        self.lengths[column] = n+1
         self.setcol = column+1
-        self.shape = (self.columns(), self.rows())
+        self.version += 1
+        if n+1 > self.shape[1]:
+            self.shape = (self.shape[0], n+1)
 
     def add_data(self, data, column=None):
         for val in data:
             self.add_value(val, column)
             column = None
 
+    def remove_row(self, row):
+        # remove a row from all columns:
+        for c in range(len(self.data)):
+            n = self.lengths[c]
+            if row >= n:
+                continue
+            self.data[c][row:n-1] = self.data[c][row+1:n]
+            if self.valid[c] is not None:
+                self.valid[c][row:n-1] = self.valid[c][row+1:n]
+                self.valid[c][n-1] = False
+                self.data[c][n-1] = ''
+            else:
+                self.data[c][n-1] = np.nan
+            self.lengths[c] = n-1
+        self.shape = (self.shape[0], max(self.lengths))
+        self.indices = None
+        self.version += 1
+
     def set_column(self, column):
         col = self.col(column)
         if col is None:
@@ -228,17 +343,14 @@ class DataTable:
         return col
 
     def fill_data(self):
-        # maximum rows:
-        r = 0
-        for c in range(len(self.data)):
-            if r < len(self.data[c]):
-                r = len(self.data[c])
-        # fill up:
+        # fill up with missing values to maximum rows:
+        r = self.rows()
         for c in range(len(self.data)):
-            while len(self.data[c]) < r:
-                self.data[c].append(float('NaN'))
+            if self.lengths[c] < r:
+                self._reserve(c, r)
+                self.lengths[c] = r
         self.setcol = 0
-        self.shape = (self.columns(), self.rows())
+        self.version += 1
 
     def hide(self, column):
         c0, c1 = self.find_col(column)
@@ -250,19 +362,17 @@ class DataTable:
         for c in range(len(self.hidden)):
             self.hidden[c] = True
 
+    def show_all(self):
+        for c in range(len(self.hidden)):
+            self.hidden[c] = False
+
     def hide_empty_columns(self, missing='-'):
         for c in range(len(self.data)):
             # check for empty column:
-            isempty = True
-            for v in self.data[c]:
-                if isinstance(v, float):
-                    if not m.isnan(v):
-                        isempty = False
-                        break
-                else:
-                    if v != missing:
-                        isempty = False
-                        break
+            if self.valid[c] is not None:
+                isempty = np.all(self.is_missing(c) | (self.values(c) == missing))
+            else:
+                isempty = np.all(self.is_missing(c))
             if isempty:
                 self.hidden[c] = True
 
@@ -272,32 +382,42 @@ class DataTable:
             for c in range(c0, c1):
                 self.hidden[c] = False
 
+    def format_width(self, f):
+        # position and value of the width in format string f:
+        i0 = 1
+        if f[1] == '-' :
+            i0 = 2
+        i1 = f.find('.')
+        w = 0
+        if len(f[i0:i1]) > 0:
+            w = int(f[i0:i1])
+        return i0, i1, w
+
+    def format_cells(self, column, missing='-'):
+        # strings of all values of a column formatted without width,
+        # cached until the data or the format change:
+        f = self.formats[column]
+        i0, i1, w = self.format_width(f)
+        key = (f[:i0] + f[i1:], missing, self.version)
+        if column not in self.cells or self.cells[column][0] != key:
+            isnan = self.is_missing(column)
+            fmt = key[0]
+            cells = [missing if nan else fmt % v
+                     for v, nan in zip(self.values(column).tolist(), isnan)]
+            self.cells[column] = (key, cells, isnan)
+        return self.cells[column][1], self.cells[column][2]
+
     def adjust_columns(self, missing='-'):
         for c, f in enumerate(self.formats):
-            w = 0
             # extract width from format:
-            i0 = 1
-            if f[1] == '-' :
-                i0 = 2
-            i1 = f.find('.')
-            if len(f[i0:i1]) > 0:
-                w = int(f[i0:i1])
+            i0, i1, w = self.format_width(f)
             # adapt width to header:
             if w < len(self.header[c][0]):
                 w = len(self.header[c][0])
             # adapt width to data:
-            if f[-1] == 's':
-                for v in self.data[c]:
-                    if w < len(v):
-                        w = len(v)
-            else:
-                for v in self.data[c]:
-                    if isinstance(v, float) and m.isnan(v):
-                        s = missing
-                    else:
-                        s = f % v
-                    if w < len(s):
-                        w = len(s)
+            cells, isnan = self.format_cells(c, missing)
+            if len(cells) > 0:
+                w = max(w, max(map(len, cells)))
             # set width of format string:
             f = f[:i0] + str(w) + f[i1:]
             self.formats[c] = f
@@ -307,7 +427,7 @@ class DataTable:
             columns = [ columns ]
         if len(columns) == 0:
             return
-        self.indices = range(len(self.data[0]))
+        self.indices = range(self.rows())
         for col in reversed(columns):
             rev = False
             if len(col) > 0 and col[0] in '^!':
@@ -317,7 +437,7 @@ class DataTable:
             if c is None:
                 print('sort column ' + col + ' not found')
                 continue
-            self.indices = sorted(self.indices, key=self.data[c].__getitem__, reverse=rev)
+            self.indices = sorted(self.indices, key=self.values(c).__getitem__, reverse=rev)
 
     def write_keys(self, sep='>', space=None):
         fh = self.nsecs * ['']
@@ -334,12 +454,13 @@ class DataTable:
         # inspired by https://stackoverflow.com/a/37604105
         d, m = divmod(n, 26)
         bm = chr(ord(a)+m)
-        return index2aa(d-1, a) + bm if d else bm
+        return self.index2aa(d-1, a) + bm if d else bm
 
     def write(self, df, table_format='dat', units="row", number_cols=None, missing='-'):
         # table_format: "dat", "ascii", "rtai", "csv", "md", "html", "tex"
         # units: "row", "header" or "none"
         # number_cols: add row with colum numbers ('num', 'index') or letters ('aa' or 'AA')
+        tf = table_format[0]
         format_width = True
         begin_str = ''
         end_str = ''
@@ -354,7 +475,7 @@ class DataTable:
         top_line = False
         header_line = False
         bottom_line = False
-        if table_format[0] == 'a':
+        if tf == 'a':
             format_width = True
             begin_str = ''
             end_str = ''
@@ -369,7 +490,7 @@ class DataTable:
             top_line = True
             header_line = True
             bottom_line = True
-        elif table_format[0] == 'r':
+        elif tf == 'r':
             format_width = True
             begin_str = ''
             end_str = ''
@@ -384,7 +505,7 @@ class DataTable:
             top_line = False
             header_line = False
             bottom_line = False
-        elif table_format[0] == 'c':
+        elif tf == 'c':
             # cvs according to http://www.ietf.org/rfc/rfc4180.txt :
             number_cols=None
             if units == "row":
@@ -401,7 +522,7 @@ class DataTable:
             top_line = False
             header_line = False
             bottom_line = False
-        elif table_format[0] == 'm':
+        elif tf == 'm':
             number_cols=None
             if units == "row":
                 units = "header"
@@ -417,7 +538,7 @@ class DataTable:
             top_line = False
             header_line = True
             bottom_line = False
-        elif table_format[0] == 'h':
+        elif tf == 'h':
             format_width = False
             begin_str = '<table>\n<thead>\n'
             end_str = '</tbody>\n</table>\n'
@@ -432,7 +553,7 @@ class DataTable:
             top_line = False
             header_line = False
             bottom_line = False
-        elif table_format[0] == 't':
+        elif tf == 't':
             format_width = False
             begin_str = '\\begin{tabular}'
             end_str = '\\end{tabular}\n'
@@ -449,51 +570,45 @@ class DataTable:
             bottom_line = True
 
         # begin table:
-        df.write(begin_str)
-        if table_format[0] == 't':
-            df.write('{')
+        out = [begin_str]
+        if tf == 't':
+            out.append('{')
             for f in self.formats:
                 if f[1] == '-':
-                    df.write('l')
+                    out.append('l')
                 else:
-                    df.write('r')
-            df.write('}\n')
+                    out.append('r')
+            out.append('}\n')
         # retrieve column widths:
         widths = []
         for f in self.formats:
-            i0 = 1
-            if f[1] == '-' :
-                i0 = 2
-            i1 = f.find('.')
-            if len(f[i0:i1]) > 0:
-                widths.append(int(f[i0:i1]))
-            else:
-                widths.append(1)
+            i0, i1, w = self.format_width(f)
+            widths.append(w if w > 0 else 1)
         # top line:
         if top_line:
-            if table_format[0] == 't':
-                df.write('  \\hline\n')
+            if tf == 't':
+                out.append('  \\hline\n')
             else:
                 first = True
-                df.write(header_start.replace(' ', '-'))
+                out.append(header_start.replace(' ', '-'))
                 for c in range(len(self.header)):
                     if self.hidden[c]:
                         continue
                     if not first:
-                        df.write('-'*len(header_sep))
+                        out.append('-'*len(header_sep))
                     first = False
-                    df.write(header_close)
+                    out.append(header_close)
                     w = widths[c]
-                    df.write(w*'-')
-                df.write(header_end.replace(' ', '-'))
+                    out.append(w*'-')
+                out.append(header_end.replace(' ', '-'))
         # section and column headers:
         nsec0 = 0
-        if table_format[0] in 'cm':
+        if tf in 'cm':
             nsec0 = self.nsecs
         for ns in range(nsec0, self.nsecs+1):
             nsec = self.nsecs-ns
             first = True
-            df.write(header_start)
+            out.append(header_start)
             for c in range(len(self.header)):
                 if nsec < len(self.header[c]):
                     # section width and column count:
@@ -512,172 +627,172 @@ class DataTable:
                     if columns == 0:
                         continue
                     if not first:
-                        df.write(header_sep)
+                        out.append(header_sep)
                     first = False
-                    if table_format[0] == 'h':
+                    if tf == 'h':
                         if columns>1:
-                            df.write(' colspan="%d"' % columns)
-                    elif table_format[0] == 't':
-                        df.write('\\multicolumn{%d}{l}{' % columns)
-                    df.write(header_close)
+                            out.append(' colspan="%d"' % columns)
+                    elif tf == 't':
+                        out.append('\\multicolumn{%d}{l}{' % columns)
+                    out.append(header_close)
                     hs = self.header[c][nsec]
                     if nsec == 0 and units == "header":
                         if units and self.units[c] != '1':
                             hs += '/' + self.units[c]
                     if format_width:
                         f = '%%-%ds' % sw
-                        df.write(f % hs)
+                        out.append(f % hs)
                     else:
-                        df.write(hs)
-                    if table_format[0] == 't':
-                        df.write('}')
-            df.write(header_end)
+                        out.append(hs)
+                    if tf == 't':
+                        out.append('}')
+            out.append(header_end)
         # units:
         if units == "row":
             first = True
-            df.write(header_start)
+            out.append(header_start)
             for c in range(len(self.header)):
                 if self.hidden[c]:
                     continue
                 if not first:
-                    df.write(header_sep)
+                    out.append(header_sep)
                 first = False
-                df.write(header_close)
-                if table_format[0] == 't':
-                    df.write('\\multicolumn{1}{l}{%s}' % self.units[c])
+                out.append(header_close)
+                if tf == 't':
+                    out.append('\\multicolumn{1}{l}{%s}' % self.units[c])
                 else:
                     if format_width:
                         f = '%%-%ds' % widths[c]
-                        df.write(f % self.units[c])
+                        out.append(f % self.units[c])
                     else:
-                        df.write(self.units[c])
-            df.write(header_end)
+                        out.append(self.units[c])
+            out.append(header_end)
         # column numbers:
         if number_cols is not None:
             first = True
-            df.write(header_start)
+            out.append(header_start)
             for c in range(len(self.header)):
                 if self.hidden[c]:
                     continue
                 if not first:
-                    df.write(header_sep)
+                    out.append(header_sep)
                 first = False
-                df.write(header_close)
+                out.append(header_close)
                 i = c
                 if number_cols == 'num':
                     i = c+1
                 aa = self.index2aa(c, 'a')
                 if number_cols == 'AA':
                     aa = self.index2aa(c, 'A')
-                if table_format[0] == 't':
+                if tf == 't':
                     if number_cols == 'num' or number_cols == 'index':
-                        df.write('\\multicolumn{1}{l}{%d}' % i)
+                        out.append('\\multicolumn{1}{l}{%d}' % i)
                     else:
-                        df.write('\\multicolumn{1}{l}{%s}' % aa)
+                        out.append('\\multicolumn{1}{l}{%s}' % aa)
                 else:
                     if number_cols == 'num' or number_cols == 'index':
                         if format_width:
                             f = '%%%dd' % widths[c]
-                            df.write(f % i)
+                            out.append(f % i)
                         else:
-                            df.write("%d" % i)
+                            out.append("%d" % i)
                     else:
                         if format_width:
                             f = '%%%ds' % widths[c]
-                            df.write(f % aa)
+                            out.append(f % aa)
                         else:
-                            df.write(aa)
-            df.write(header_end)
+                            out.append(aa)
+            out.append(header_end)
         # header line:
         if header_line:
-            if table_format[0] == 'm':
-                df.write('|')
+            if tf == 'm':
+                out.append('|')
                 for c in range(len(self.header)):
                     if self.hidden[c]:
                         continue
                     w = widths[c]+2
                     if self.formats[c][1] == '-':
-                        df.write(w*'-' + '|')
+                        out.append(w*'-' + '|')
                     else:
-                        df.write((w-1)*'-' + ':|')
-                df.write('\n')
-            elif table_format[0] == 't':
-                df.write('  \\hline\n')
+                        out.append((w-1)*'-' + ':|')
+                out.append('\n')
+            elif tf == 't':
+                out.append('  \\hline\n')
             else:
                 first = True
-                df.write(header_start.replace(' ', '-'))
+                out.append(header_start.replace(' ', '-'))
                 for c in range(len(self.header)):
                     if self.hidden[c]:
                         continue
                     if not first:
-                        df.write(header_sep.replace(' ', '-'))
+                        out.append(header_sep.replace(' ', '-'))
                     first = False
-                    df.write(header_close)
+                    out.append(header_close)
                     w = widths[c]
-                    df.write(w*'-')
-                df.write(header_end.replace(' ', '-'))
+                    out.append(w*'-')
+                out.append(header_end.replace(' ', '-'))
         # start table data:
-        if table_format[0] == 'h':
-            df.write('</thead>\n<tbody>\n')
+        if tf == 'h':
+            out.append('</thead>\n<tbody>\n')
         # data:
-        if self.indices is None or len(self.indices) != len(self.data[0]):
-            self.indices = range(len(self.data[0]))
-        for i, k in enumerate(self.indices):
-            first = True
-            if table_format[0] == 'h':
-                eo = "even" if i % 2 == 1 else "odd"
-                df.write('  <tr class"%s">\n    <td' % eo)
-            else:
-                df.write(data_start)
-            for c, f in enumerate(self.formats):
-                if self.hidden[c]:
-                    continue
-                if not first:
-                    df.write(data_sep)
-                first = False
-                if table_format[0] == 'h':
-                    if f[1] == '-':
-                        df.write(' align="left"')
-                    else:
-                        df.write(' align="right"')
-                df.write(data_close)
-                if isinstance(self.data[c][k], float) and m.isnan(self.data[c][k]):
-                    if format_width:
-                        if f[1] == '-':
-                            fn = '%%-%ds' % widths[c]
-                        else:
-                            fn = '%%%ds' % widths[c]
-                        df.write(fn % missing)
-                    else:
-                        df.write(missing)
+        if self.indices is None or len(self.indices) != self.rows():
+            self.indices = range(self.rows())
+        indices = list(self.indices)
+        columns = []
+        for c, f in enumerate(self.formats):
+            if self.hidden[c]:
+                continue
+            cells, isnan = self.format_cells(c, missing)
+            prefix = data_close
+            if tf == 'h':
+                if f[1] == '-':
+                    prefix = ' align="left"' + data_close
+                else:
+                    prefix = ' align="right"' + data_close
+            if format_width:
+                w = widths[c]
+                if f[1] == '-':
+                    columns.append([prefix + cells[k].ljust(w) for k in indices])
                 else:
-                    ds = f % self.data[c][k]
-                    if not format_width:
-                        ds = ds.strip()
-                    df.write(ds)
-            df.write(data_end)
+                    columns.append([prefix + cells[k].rjust(w) for k in indices])
+            else:
+                columns.append([prefix + (cells[k] if isnan[k] else cells[k].strip())
+                                for k in indices])
+        if tf == 'h':
+            starts = ['  <tr class"%s">\n    <td' % ('even' if i % 2 == 1 else 'odd')
+                      for i in range(len(indices))]
+        else:
+            starts = [data_start]*len(indices)
+        rows = zip(*columns) if len(columns) > 0 else [()]*len(indices)
+        lines = [s + data_sep.join(r) + data_end for s, r in zip(starts, rows)]
+        # write header and data in large chunks:
+        df.write(''.join(out))
+        out = []
+        for i in range(0, len(lines), 1000):
+            df.write(''.join(lines[i:i+1000]))
         # bottom line:
         if bottom_line:
-            if table_format[0] == 't':
-                df.write('  \\hline\n')
+            if tf == 't':
+                out.append('  \\hline\n')
             else:
                 first = True
-                df.write(header_start.replace(' ', '-'))
+                out.append(header_start.replace(' ', '-'))
                 for c in range(len(self.header)):
                     if self.hidden[c]:
                         continue
                     if not first:
-                        df.write('-'*len(header_sep))
+                        out.append('-'*len(header_sep))
                     first = False
-                    df.write(header_close)
+                    out.append(header_close)
                     w = widths[c]
-                    df.write(w*'-')
-                df.write(header_end.replace(' ', '-'))
+                    out.append(w*'-')
+                out.append(header_end.replace(' ', '-'))
         # end table:
-        df.write(end_str)
+        out.append(end_str)
+        df.write(''.join(out))
 
                     
-def parse_filename(filename, dt):
+def parse_filename(filename):
     # dissect filename:
     cols = os.path.basename(filename).split('-')
     kernel = '-'.join(cols[2:5])
@@ -723,28 +838,283 @@ def parse_filename(filename, dt):
         param.remove(r)
     param = '-'.join(param)
 
-    dt.add_value(num, 'data>num')
-    dt.add_value(param, 'data>kernel parameter')
-    dt.add_value(load, 'data>load')
-    dt.add_value(latency, 'data>latency')
-    dt.add_value(governor, 'data>governor')
-    dt.add_value(quality, 'data>quality')
+    return dict(host=host, kernel=kernel, num=num, date=date, param=param,
+                load=load, latency=latency, governor=governor,
+                quality=quality, cpuid=cpuid)
+
+# metadata of a report from its file name and environment:
+archive_text = ['host', 'kernel', 'num', 'date', 'param', 'load', 'latency',
+                'governor', 'quality', 'filename']
+archive_numbers = ['cpuid', 'isolcpus', 'temp', 'freq', 'poll']
+
+class Report:
+    # metadata, environment, raw data and results of a single test report.
+    # data: raw data of the tests by (testmode, testtype, name)
+    # results: values of the analysis by table column
+    # histograms: latency histograms by testmode (--sketch only)
+    # spikes: details of the spike analysis by testmode
+    # plots: latency histograms for plotting by testmode
+    # profile: run times and counts of parsing and analysis
+    __slots__ = archive_text + archive_numbers + \
+        ['data', 'results', 'histograms', 'spikes', 'plots', 'profile']
+
+    def __init__(self, filename='', **metadata):
+        self.filename = filename
+        for key in archive_text[:-1]:
+            setattr(self, key, metadata.get(key, '-'))
+        for key in archive_numbers:
+            setattr(self, key, metadata.get(key, float('NaN')))
+        self.data = {}
+        self.results = {}
+        self.histograms = {}
+        self.spikes = {}
+        self.plots = {}
+        self.profile = []
+
+    def __repr__(self):
+        return 'Report(%r)' % self.filename
+
+    def metadata(self):
+        return dict((key, getattr(self, key)) for key in archive_text + archive_numbers)
+
+    def tests(self):
+        # results by testmode and column ('latencies>max', ...):
+        tests = {}
+        for column, value in self.results.items():
+            section, name = column.split('>')
+            testmode, testtype = section.split(' ')
+            tests.setdefault(testmode, {})[testtype + '>' + name] = value
+        return tests
 
-    return cpuid
+def partial_percentiles(data, percentiles):
+    # percentiles like np.percentile() but by partial sorting,
+    # returns the percentiles and the partitioned data:
+    ranks = np.asarray(percentiles, dtype=float)*0.01*(len(data)-1)
+    lower = np.floor(ranks).astype(int)
+    upper = np.ceil(ranks).astype(int)
+    kth = np.unique(np.concatenate((lower, upper)))
+    part = np.partition(data, kth)
+    values = part[lower] + (ranks - lower)*(part[upper] - part[lower])
+    return values, part
 
 def analyze_latencies(data, outlier):
     if len(data) == 0:
         return  float('NaN'),  float('NaN'), float('NaN')
-    coredata = data
     if outlier > 0.0 :
-        l, m, h = np.percentile(data, [outlier, 50.0, 100.0-outlier])
-        coredata = data[(data>=l)&(data<=h)]
-    mean = np.mean(coredata)
-    std = np.std(coredata)
-    minv = np.min(data)
+        ranks = np.array([outlier, 100.0-outlier])*0.01*(len(data)-1)
+        i0 = int(np.ceil(ranks[0]))
+        i1 = int(np.floor(ranks[1]))
+        (l, h), part = partial_percentiles(data, [outlier, 100.0-outlier])
+        if i0 <= i1:
+            # all data between i0 and i1 are within l and h,
+            # only the remaining tails need to be checked:
+            lower = part[:i0]
+            upper = part[i1+1:]
+            cores = [lower[lower>=l], part[i0:i1+1], upper[upper<=h]]
+            n = sum(len(c) for c in cores)
+            mean = sum(np.sum(c) for c in cores)/n
+            std = np.sqrt(sum(np.sum((c - mean)**2) for c in cores)/n)
+        else:
+            coredata = data[(data>=l)&(data<=h)]
+            mean = np.mean(coredata)
+            std = np.std(coredata)
+    else:
+        mean = np.mean(data)
+        std = np.std(data)
     maxv = np.max(data)
     return mean, std, maxv
 
+def analyze_tails(data, percentiles, deadline=None):
+    # high percentiles and percentage of latencies exceeding deadline:
+    values = np.full(len(percentiles) + (deadline is not None), np.nan)
+    if len(data) == 0:
+        return values
+    if len(percentiles) > 0:
+        values[:len(percentiles)], part = partial_percentiles(data, percentiles)
+    if deadline is not None:
+        values[-1] = 100.0*np.count_nonzero(data > deadline)/len(data)
+    return values
+
+def longest_runs(mask):
+    # start indices and lengths of runs of True values in mask:
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    return starts, np.flatnonzero(edges == -1) - starts
+
+spikes_threshold = 10000.0
+
+def analyze_spikes(latencies, overruns, threshold, window, offset=0, worst=3):
+    # spikes of latencies above threshold and bursts of overruns
+    # of a latency test with one line per second.
+    # offset: index of the first line in the test
+    # Returns spike count, longest burst of spikes, median interval between
+    # spikes, longest burst of overruns, and details:
+    details = {}
+    spike = latencies > threshold
+    indices = np.flatnonzero(spike)
+    details['spikes'] = len(indices)
+    starts, lengths = longest_runs(spike)
+    burst = np.argmax(lengths) if len(lengths) > 0 else None
+    details['burst'] = (int(lengths[burst]), int(starts[burst]) + offset) \
+        if burst is not None else (0, None)
+    intervals = np.diff(indices)
+    details['intervals'] = np.percentile(intervals, [0, 25, 50, 75, 100]) \
+        if len(intervals) > 0 else None
+    # overruns are differences of the overrun counter,
+    # element i belongs to line i+1:
+    starts, lengths = longest_runs(overruns > 0)
+    burst = np.argmax(lengths) if len(lengths) > 0 else None
+    details['overrun bursts'] = len(lengths)
+    details['overrun burst'] = (int(lengths[burst]), int(starts[burst]) + offset + 1) \
+        if burst is not None else (0, None)
+    # rolling means, maxima and spike counts of windows:
+    windows = []
+    if len(latencies) >= window > 0:
+        cum = np.cumsum(np.concatenate(([0], latencies)).astype(float))
+        means = (cum[window:] - cum[:-window])/window
+        cum = np.cumsum(np.concatenate(([0], spike)))
+        counts = cum[window:] - cum[:-window]
+        maxs = np.lib.stride_tricks.sliding_window_view(latencies, window).max(axis=1)
+        # non-overlapping windows with the highest mean latencies:
+        for i in np.argsort(means)[::-1]:
+            if all(abs(i - j) >= window for j, *_ in windows):
+                windows.append((int(i), means[i], maxs[i], int(counts[i])))
+                if len(windows) >= worst:
+                    break
+    details['windows'] = [(i + offset, mean, maxv, count)
+                          for i, mean, maxv, count in windows]
+    values = [details['spikes'], details['burst'][0],
+              details['intervals'][2] if details['intervals'] is not None else float('NaN'),
+              details['overrun burst'][0]]
+    return values, details
+
+def write_spikes(df, report, threshold, window):
+    # details of analyze_spikes() for all test modes of a report:
+    for testmode, details in report.spikes.items():
+        df.write('%s  %s\n' % (os.path.basename(report.filename), testmode))
+        length, start = details['burst']
+        df.write('  spikes:         %d above %gns' % (details['spikes'], threshold))
+        if start is not None:
+            df.write(', longest burst %ds at line %d' % (length, start))
+        df.write('\n')
+        if details['intervals'] is not None:
+            df.write('  intervals:      min %.0fs, 25%% %.0fs, median %.0fs, 75%% %.0fs, max %.0fs\n'
+                     % tuple(details['intervals']))
+        length, start = details['overrun burst']
+        df.write('  overruns:       %d bursts' % details['overrun bursts'])
+        if start is not None:
+            df.write(', longest %ds at line %d' % (length, start))
+        df.write('\n')
+        for k, (i, mean, maxv, count) in enumerate(details['windows']):
+            df.write('  %-15s line %d (%ds-%ds): mean %.0fns, max %.0fns, %d spikes\n'
+                     % ('worst windows:' if k == 0 else '', i, i, i + window,
+                        mean, maxv, count))
+
+class LatencyHistogram:
+    # histogram of latencies with logarithmic bins of bounded relative
+    # error that can be merged with histograms of other tests.
+    # Mean, standard deviation, minimum and maximum are exact.
+
+    def __init__(self, precision=0.01):
+        self.precision = precision
+        self.gamma = (1.0 + precision)/(1.0 - precision)
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.zeros = 0      # number of values below one
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0       # sum of squared deviations from mean
+        self.minv = float('NaN')
+        self.maxv = float('NaN')
+
+    def _add_counts(self, offset, counts):
+        if len(self.counts) == 0:
+            self.offset = offset
+            self.counts = np.array(counts, dtype=np.int64)
+            return
+        start = min(self.offset, offset)
+        stop = max(self.offset + len(self.counts), offset + len(counts))
+        newcounts = np.zeros(stop - start, dtype=np.int64)
+        newcounts[self.offset-start:self.offset-start+len(self.counts)] += self.counts
+        newcounts[offset-start:offset-start+len(counts)] += counts
+        self.offset = start
+        self.counts = newcounts
+
+    def _add_moments(self, n, mean, m2, minv, maxv):
+        # parallel algorithm of Chan et al.:
+        if n == 0:
+            return
+        if self.n == 0:
+            self.minv = minv
+            self.maxv = maxv
+        else:
+            self.minv = min(self.minv, minv)
+            self.maxv = max(self.maxv, maxv)
+        total = self.n + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta*delta*self.n*n/total
+        self.mean += delta*n/total
+        self.n = total
+
+    def add(self, data):
+        if len(data) == 0:
+            return self
+        data = np.asarray(data, dtype=float)
+        large = data[data >= 1.0]
+        self.zeros += len(data) - len(large)
+        if len(large) > 0:
+            inx = np.floor(np.log(large)/np.log(self.gamma)).astype(np.int64)
+            offset = np.min(inx)
+            self._add_counts(offset, np.bincount(inx - offset))
+        mean = np.mean(data)
+        self._add_moments(len(data), mean, np.sum((data - mean)**2),
+                          np.min(data), np.max(data))
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError('can not merge histograms of different precision')
+        self._add_counts(other.offset, other.counts)
+        self.zeros += other.zeros
+        self._add_moments(other.n, other.mean, other.m2, other.minv, other.maxv)
+        return self
+
+    def bins(self):
+        # representative values and counts of all bins:
+        values = 2.0*self.gamma**(np.arange(len(self.counts)) + self.offset + 1)/(self.gamma + 1.0)
+        values = np.concatenate(([0.0], values))
+        counts = np.concatenate(([self.zeros], self.counts))
+        return np.clip(values, self.minv, self.maxv), counts
+
+    def std(self):
+        if self.n == 0:
+            return float('NaN')
+        return m.sqrt(self.m2/self.n)
+
+    def quantile(self, percentiles):
+        # values at percentiles (in percent):
+        if self.n == 0:
+            return np.full(len(percentiles), np.nan)
+        values, counts = self.bins()
+        ranks = np.asarray(percentiles, dtype=float)*0.01*(self.n - 1)
+        inx = np.searchsorted(np.cumsum(counts), ranks, side='right')
+        return values[np.minimum(inx, len(values)-1)]
+
+def analyze_histogram(hist, outlier):
+    if hist.n == 0:
+        return  float('NaN'),  float('NaN'), float('NaN')
+    mean = hist.mean
+    std = hist.std()
+    if outlier > 0.0 :
+        l, h = hist.quantile([outlier, 100.0-outlier])
+        values, counts = hist.bins()
+        sel = (values >= l) & (values <= h)
+        values = values[sel]
+        counts = counts[sel]
+        mean = np.sum(counts*values)/np.sum(counts)
+        std = np.sqrt(np.sum(counts*(values - mean)**2)/np.sum(counts))
+    return mean, std, hist.maxv
+
 def analyze_overruns(data):
     if len(data) == 0:
         return  [float('NaN')]
@@ -753,8 +1123,1893 @@ def analyze_overruns(data):
     maxv = np.max(data)
     return [maxv, len(data)]
 
+rtd_line = re.compile(rb'^RTD\|([^\n]*)', re.M)
+
+def parse_rtd(block, ncols):
+    # decode the first ncols columns of all RTD| lines of a test section
+    # into a 2-D array, further columns are ignored:
+    rows = rtd_line.findall(block)
+    if len(rows) == 0:
+        return np.zeros((0, ncols), dtype=np.int64)
+    rcols = rows[0].count(b'|') + 1
+    try:
+        values = np.fromstring(b' '.join(rows).replace(b'|', b' '),
+                               dtype=np.int64, sep=' ')
+    except ValueError:
+        values = np.zeros(0, dtype=np.int64)
+    if rcols >= ncols and len(values) == len(rows)*rcols:
+        return values.reshape((-1, rcols))[:, :ncols]
+    # inconsistent lines, decode the needed columns line by line
+    # and skip lines that can not be decoded:
+    table = []
+    for r in rows:
+        cols = r.split(b'|')[:ncols]
+        if len(cols) < ncols:
+            continue
+        try:
+            table.append([int(c) for c in cols])
+        except ValueError:
+            pass
+    return np.array(table, dtype=np.int64).reshape((-1, ncols))
+
+def parse_switches(block):
+    switches = []
+    for line in block.splitlines():
+        if b'SWITCH TIME' in line:
+            switches.append(int(line.split()[-2]))
+    return np.array(switches)
+
+def test_sections(buf, start, end):
+    # byte ranges of the test sections between start and end:
+    sections = []
+    pos = start
+    while True:
+        h = buf.find(b'test:', pos, end)
+        if h < 0:
+            break
+        stop = buf.find(b'------------', h, end)
+        if stop < 0:
+            break
+        # a new test header discards the previous unterminated test:
+        n = buf.rfind(b'test:', h+5, stop)
+        if n >= 0:
+            h = n
+        h = max(start, buf.rfind(b'\n', start, h) + 1)
+        tests = buf[h:buf.find(b'\n', h, stop)].split()[0].decode()
+        testmode, testtype = tests.split('/')
+        sections.append((testmode, testtype, h, stop))
+        pos = buf.find(b'\n', stop, end) + 1
+        if pos <= 0:
+            break
+    return sections
+
+def add_test_data(data, testmode, testtype, block):
+    if testtype == 'latency':
+        rtd = parse_rtd(block, 6)
+        data[testmode, testtype, 'latencies'] = rtd[:,3] - rtd[:,0]
+        data[testmode, testtype, 'overruns'] = rtd[:,5]
+    elif testtype == 'switches':
+        data[testmode, testtype, 'switches'] = parse_switches(block)
+    elif testtype == 'preempt':
+        rtd = parse_rtd(block, 5)
+        data[testmode, testtype, 'latencies'] = rtd[:,2] - rtd[:,0]
+        data[testmode, testtype, 'jitterfast'] = rtd[:,3]
+        data[testmode, testtype, 'jitterslow'] = rtd[:,4]
+
+def sketch_latencies(data, testmode, buf, start, stop, sketch, init,
+                     chunksize=1 << 20):
+    # histogram of the latencies of a latency test section of buf,
+    # decoded chunk by chunk without keeping the raw series.
+    # Maximum and count of the overruns per line go into data:
+    hist = LatencyHistogram(sketch)
+    line = 0
+    last = None
+    maxv = float('NaN')
+    n = 0
+    while start < stop:
+        end = buf.find(b'\n', min(start + chunksize, stop), stop)
+        end = stop if end < 0 else end + 1
+        rtd = parse_rtd(buf[start:end], 6)
+        start = end
+        hist.add((rtd[:,3] - rtd[:,0])[max(0, init - line):])
+        # overruns per line, the first one belongs to the second line:
+        overruns = rtd[:,5]
+        if last is not None:
+            overruns = np.concatenate(([last], overruns))
+        if len(rtd) > 0:
+            last = rtd[-1,5]
+        diffs = np.diff(overruns)[max(0, init - max(0, line - 1)):]
+        if len(diffs) > 0:
+            maxv = np.fmax(maxv, np.max(diffs))
+            n += len(diffs)
+        line += len(rtd)
+    data[testmode, 'latency', 'overrunstats'] = np.array([maxv, n])
+    return hist
+
+section_headers = [b'Kernel parameter', b'Environment', b'CPU topology',
+                   b'CPU core temperatures']
+section_header = re.compile(b'|'.join(section_headers))
+section_end = re.compile(rb'\n[ \t\r\f\v]*\n')
+
+def index_sections(buf, start):
+    # offsets of the first lines containing the section headers,
+    # stops as soon as all sections have been found:
+    index = {}
+    for m in section_header.finditer(buf, start):
+        header = m.group()
+        if header not in index:
+            index[header] = max(start, buf.rfind(b'\n', start, m.start()) + 1)
+            if len(index) == len(section_headers):
+                break
+    return index
+
+def section_lines(buf, index, header):
+    # lines of a section up to the next empty line:
+    if header not in index:
+        return []
+    start = index[header]
+    m = section_end.search(buf, start)
+    end = m.start() if m is not None else len(buf)
+    return buf[start:end].decode('utf-8', 'replace').splitlines()
+
+compressed_extensions = ['.gz', '.xz', '.bz2']
+# sections following all the sections needed from a report:
+trailing_sections = [b'\nHardware (lshw):', b'\nrtai-info reports:', b'\ndmesg:']
+
+def report_name(filename):
+    # name of a report file without compression extension:
+    base, ext = os.path.splitext(filename)
+    return base if ext in compressed_extensions else filename
+
+def open_compressed(filename, source=None):
+    # source: file name or file object, defaults to filename
+    if source is None:
+        source = filename
+    ext = os.path.splitext(filename)[1]
+    if ext == '.gz':
+        import gzip
+        return gzip.open(source, 'rb')
+    elif ext == '.xz':
+        import lzma
+        return lzma.open(source, 'rb')
+    else:
+        import bz2
+        return bz2.open(source, 'rb')
+
+def read_stream(sf, chunksize=1 << 20):
+    # read a report from a file object only up to the last needed section:
+    buf = bytearray()
+    while True:
+        try:
+            chunk = sf.read(chunksize)
+        except EOFError:
+            # truncated file, use what we have:
+            break
+        if len(chunk) == 0:
+            break
+        start = max(0, len(buf) - 64)
+        buf += chunk
+        end = buf.find(b'Loaded modules')
+        if end < 0:
+            continue
+        if any(buf.find(s, max(start, end)) >= 0 for s in trailing_sections):
+            break
+        index = index_sections(buf, end)
+        if len(index) == len(section_headers) and \
+           section_end.search(buf, max(index.values())) is not None:
+            break
+    return bytes(buf)
+
+def read_compressed(filename):
+    with open_compressed(filename) as sf:
+        return read_stream(sf)
+
+def read_report(filename):
+    # content of a report file, memory mapped if not compressed:
+    if report_name(filename) != filename:
+        return read_compressed(filename)
+    with open(filename, 'rb') as sf:
+        try:
+            return mmap.mmap(sf.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped:
+            return b''
+
+def parse_report(filename, buf=None, sketch=None, init=0):
+    # buf: content of the report, read from filename if None
+    # sketch: precision of latency histograms that are built while parsing
+    # instead of keeping the latencies, the first init lines are skipped
+    report = Report(filename, **parse_filename(report_name(filename)))
+    cpuid = report.cpuid
+    if buf is None:
+        buf = read_report(filename)
+
+    # gather test data:
+    end = buf.find(b'Loaded modules')
+    if end < 0:
+        end = len(buf)
+    data = {}
+    for testmode, testtype, start, stop in test_sections(buf, 0, end):
+        if sketch is not None and testtype == 'latency':
+            report.histograms[testmode] = sketch_latencies(
+                data, testmode, buf, start, stop, sketch, init)
+        else:
+            add_test_data(data, testmode, testtype, buf[start:stop])
+
+    # gather other data:
+    isolcpus = float('NaN')
+    coretemp = float('NaN')
+    cpufreq = float('NaN')
+    poll = float('NaN')
+    eol = buf.find(b'\n', end)
+    sections = {}
+    if end < len(buf) and eol >= 0:
+        sections = index_sections(buf, eol+1)
+    for line in section_lines(buf, sections, b'Kernel parameter'):
+        if 'isolcpus' in line:
+            isolcpus = int(list(filter(str.isdigit, line))[0])
+    for line in section_lines(buf, sections, b'Environment'):
+        if "tests run on cpu" in line:
+            cpuid = int(line.split(':')[1].strip())
+    for line in section_lines(buf, sections, b'CPU topology'):
+        if 'cpu%d' % cpuid in line:
+            cols = line.split()
+            if len(cols) >= 5:
+                cpufreq = float(cols[4].strip())
+                if cpufreq > 1000.0:
+                    cpufreq *= 0.001
+            if len(cols) >= 9:
+                poll = float(cols[8].strip().rstrip('%'))
+    for line in section_lines(buf, sections, b'CPU core temperatures'):
+        if 'Core %d' % cpuid in line:
+            coretemp = float(line.split(':')[1].split()[0].lstrip('+').rstrip('\xc2\xb0C'))
+    if isinstance(buf, mmap.mmap):
+        buf.close()
+
+    report.cpuid = cpuid
+    report.isolcpus = isolcpus
+    report.temp = coretemp
+    report.freq = cpufreq
+    report.poll = poll
+    report.data = data
+    return report
+
+def analyze_report(report, init, outlier, sketch=None, tails=[], deadline=None,
+                   spikes=None, window=10):
+    # values of table columns:
+    # sketch: precision of latency histograms used instead of the raw data
+    # tails: percentiles for additional columns
+    # deadline: latency in nanoseconds for counting deadline misses
+    # spikes: latency in nanoseconds for counting spikes in the series
+    # window: number of lines of the rolling windows of the spike analysis
+    data = report.data
+    results = {}
+    histograms = {}
+    details = {}
+
+    def add_results(section, names, values):
+        for name, value in zip(names, values):
+            results[section + '>' + name] = float(value)
+
+    for testmode in ['kern', 'kthreads', 'user']:
+        if (testmode, 'latency', 'overrunstats') in data:
+            # latency test sketched while parsing:
+            section = testmode + ' latencies'
+            hist = report.histograms[testmode]
+            histograms[testmode] = hist
+            add_results(section, ['mean jitter', 'stdev', 'max'],
+                        analyze_histogram(hist, outlier))
+            maxv, n = data[testmode, 'latency', 'overrunstats']
+            add_results(section, ['overruns', 'n'], [maxv, n] if n > 0 else [maxv])
+            if len(tails) > 0:
+                add_results(section, ['p%g' % p for p in tails], hist.quantile(tails))
+        elif (testmode, 'latency', 'latencies') in data:
+            # analyze latency test:
+            section = testmode + ' latencies'
+            latencies = data[testmode, 'latency', 'latencies']
+            overruns = data[testmode, 'latency', 'overruns']
+            overruns = np.diff(overruns)
+            if sketch is not None:
+                hist = LatencyHistogram(sketch).add(latencies[init:])
+                histograms[testmode] = hist
+                values = analyze_histogram(hist, outlier)
+            else:
+                values = analyze_latencies(latencies[init:], outlier)
+            add_results(section, ['mean jitter', 'stdev', 'max'], values)
+            add_results(section, ['overruns', 'n'], analyze_overruns(overruns[init:]))
+            if len(tails) > 0 or deadline is not None:
+                if sketch is not None:
+                    # only the deadline misses need the raw data:
+                    values = np.concatenate((hist.quantile(tails),
+                                             analyze_tails(latencies[init:], [], deadline)))
+                else:
+                    values = analyze_tails(latencies[init:], tails, deadline)
+                add_results(section, ['p%g' % p for p in tails] + ['misses'], values)
+            if spikes is not None:
+                values, details[testmode] = analyze_spikes(
+                    latencies[init:], overruns[init:], spikes, window, init)
+                add_results(section, ['spikes', 'burst', 'gap', 'ovburst'], values)
+        if (testmode, 'switches', 'switches') in data:
+            # analyze switches test:
+            add_results(testmode + ' switches', ['susp', 'sem', 'rpc'],
+                        data[testmode, 'switches', 'switches'])
+        if (testmode, 'preempt', 'latencies') in data:
+            # analyze preempt test:
+            add_results(testmode + ' preempt', ['max', 'jitfast', 'jitslow', 'n'],
+                        [data[testmode, 'preempt', 'latencies'][-1],
+                         data[testmode, 'preempt', 'jitterfast'][-1],
+                         data[testmode, 'preempt', 'jitterslow'][-1],
+                         len(data[testmode, 'preempt', 'jitterslow'])])
+    report.results = results
+    report.histograms = histograms
+    report.spikes = details
+    return report
+
+cache_dirname = '.testreport-cache'
+# increase whenever parse_report() or the cache format changes,
+# cache files of other versions are parsed again:
+cache_version = 1
+
+def compact_array(values):
+    # store samples with the smallest sufficient integer type:
+    if len(values) > 0 and values.dtype.kind == 'i' and \
+       np.iinfo(np.int32).min <= np.min(values) and \
+       np.max(values) <= np.iinfo(np.int32).max:
+        return values.astype(np.int32)
+    return values
+
+def cache_file(filename):
+    # cache files are stored next to the reports and are named by the hashed path:
+    key = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()
+    return os.path.join(os.path.dirname(filename), cache_dirname, key + '.npz')
+
+def load_cached_report(filename, stat):
+    cachefile = cache_file(filename)
+    try:
+        with np.load(cachefile) as cf:
+            meta = json.loads(str(cf['meta']))
+            if meta.get('version') != cache_version or \
+               meta['size'] != stat.st_size or meta['mtime'] != stat.st_mtime_ns:
+                return None
+            report = Report(filename, **meta['report'])
+            for key in cf.files:
+                if key != 'meta':
+                    report.data[tuple(key.split('/'))] = cf[key]
+        # mark as recently used:
+        os.utime(cachefile)
+        return report
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_cached_report(report, stat):
+    cachefile = cache_file(report.filename)
+    metadata = report.metadata()
+    del metadata['filename']
+    meta = dict(version=cache_version, size=stat.st_size,
+                mtime=stat.st_mtime_ns, report=metadata)
+    arrays = {'meta': np.array(json.dumps(meta))}
+    for key, values in report.data.items():
+        arrays['/'.join(key)] = compact_array(values)
+    try:
+        os.makedirs(os.path.dirname(cachefile), exist_ok=True)
+        tmpfile = '%s.%d.tmp' % (cachefile[:-4], os.getpid())
+        with open(tmpfile, 'wb') as cf:
+            np.savez(cf, **arrays)
+        os.replace(tmpfile, cachefile)
+    except OSError:
+        pass
+
+def prune_cache(cachedir, maxsize):
+    # remove least recently used cache files until total size is below maxsize:
+    try:
+        entries = []
+        for name in os.listdir(cachedir):
+            path = os.path.join(cachedir, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(e[1] for e in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= maxsize:
+                break
+            os.remove(path)
+            total -= size
+    except OSError:
+        pass
+
+archive_extension = '.npz'
+
+def is_archive(filename):
+    return filename.endswith(archive_extension)
+
+def save_archive(filename, reports):
+    # store metadata and raw data of all reports in columns,
+    # the data of each test are concatenated and indexed by offsets:
+    arrays = {}
+    for key in archive_text:
+        arrays['meta/' + key] = np.array([getattr(r, key) for r in reports], dtype=str)
+    for key in archive_numbers:
+        arrays['meta/' + key] = np.array([getattr(r, key) for r in reports], dtype=float)
+    keys = sorted(set(k for r in reports for k in r.data))
+    for key in keys:
+        name = '/'.join(key)
+        values = [r.data.get(key, np.zeros(0, dtype=np.int64)) for r in reports]
+        arrays[name] = compact_array(np.concatenate(values) if len(values) > 0 else np.zeros(0))
+        arrays[name + ':offsets'] = np.cumsum([0] + [len(v) for v in values])
+        arrays[name + ':present'] = np.array([key in r.data for r in reports])
+    np.savez(filename, **arrays)
+
+def mmap_npz(filename):
+    # memory map all arrays of an uncompressed npz file:
+    import zipfile
+    arrays = {}
+    with open(filename, 'rb') as sf:
+        buf = mmap.mmap(sf.fileno(), 0, access=mmap.ACCESS_READ)
+    with zipfile.ZipFile(filename) as zf:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED or \
+               not info.filename.endswith('.npy'):
+                continue
+            # the data follow the local file header:
+            start = info.header_offset
+            namelen, extralen = struct.unpack('<HH', buf[start+26:start+30])
+            start += 30 + namelen + extralen
+            fp = io.BytesIO(buf[start:start+min(info.file_size, 65536)])
+            version = np.lib.format.read_magic(fp)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(fp)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(fp)
+            count = int(np.prod(shape))
+            values = np.frombuffer(buf, dtype=dtype, count=count, offset=start+fp.tell())
+            arrays[info.filename[:-4]] = values.reshape(shape, order='F' if fortran else 'C')
+    return arrays
+
+def load_archive(filename):
+    # generator of reports stored in an archive:
+    arrays = mmap_npz(filename)
+    meta = dict((k[5:], v) for k, v in arrays.items() if k.startswith('meta/'))
+    keys = [k for k in arrays if k.endswith(':present')]
+    for i in range(len(meta['filename'])):
+        metadata = {}
+        for key in archive_text:
+            metadata[key] = str(meta[key][i])
+        for key in archive_numbers:
+            metadata[key] = float(meta[key][i])
+        metadata['cpuid'] = int(metadata['cpuid'])
+        report = Report(**metadata)
+        for key in keys:
+            if arrays[key][i]:
+                name = key[:-len(':present')]
+                offsets = arrays[name + ':offsets']
+                report.data[tuple(name.split('/'))] = arrays[name][offsets[i]:offsets[i+1]]
+        yield report
+
+database_extensions = ['.db', '.sqlite', '.sqlite3']
+
+def is_database(filename):
+    return os.path.splitext(filename)[1] in database_extensions
+
+def open_database(filename):
+    # metadata of the reports and their table columns:
+    import sqlite3
+    db = sqlite3.connect(filename)
+    columns = ', '.join(['%s text' % k for k in archive_text] +
+                        ['%s real' % k for k in archive_numbers])
+    db.executescript('''
+        create table if not exists reports (id integer primary key, %s, unique (filename));
+        create table if not exists results (report integer, path text, value real);
+        create index if not exists reports_host on reports (host);
+        create index if not exists reports_kernel on reports (kernel);
+        create index if not exists reports_date on reports (date);
+        create index if not exists reports_param on reports (param);
+        create index if not exists results_report on results (report);
+        ''' % columns)
+    return db
+
+def save_database(filename, reports):
+    # add reports to database, replacing previous results of the same files:
+    keys = archive_text + archive_numbers
+    db = open_database(filename)
+    with db:
+        for report in reports:
+            values = report.metadata()
+            values['filename'] = os.path.abspath(report.filename)
+            db.execute('delete from results where report in (select id from reports where filename = ?)',
+                       (values['filename'],))
+            db.execute('delete from reports where filename = ?', (values['filename'],))
+            cursor = db.execute('insert into reports (%s) values (%s)' %
+                                (', '.join(keys), ', '.join(['?']*len(keys))),
+                                [values[k] for k in keys])
+            db.executemany('insert into results values (?, ?, ?)',
+                           [(cursor.lastrowid, path, value)
+                            for path, value in report.results.items()])
+    db.close()
+
+def load_database(filename, where=''):
+    # generator of analyzed reports matching the sql condition where:
+    keys = archive_text + archive_numbers
+    db = open_database(filename)
+    condition = ' where ' + where if where else ''
+    results = {}
+    for report, path, value in db.execute(
+            'select report, path, value from results where report in '
+            '(select id from reports%s) order by report, rowid' % condition):
+        # sqlite stores NaN as NULL:
+        results.setdefault(report, {})[path] = float('NaN') if value is None else value
+    for row in db.execute('select id, %s from reports%s order by filename' %
+                          (', '.join(keys), condition)):
+        metadata = dict(zip(keys, row[1:]))
+        for key in archive_numbers:
+            if metadata[key] is None:
+                metadata[key] = float('NaN')
+        metadata['cpuid'] = int(metadata['cpuid'])
+        report = Report(**metadata)
+        report.results = results.get(row[0], {})
+        yield report
+    db.close()
+
+def check_database(filename, where=''):
+    # error message of selecting reports of a database by the sql
+    # condition where, None if the condition is fine:
+    import sqlite3
+    condition = ' where ' + where if where else ''
+    try:
+        db = open_database(filename)
+        db.execute('select count(*) from reports%s' % condition).fetchone()
+        db.close()
+    except sqlite3.Error as e:
+        return str(e)
+    return None
+
+class Profile:
+    # accumulated wall times and counts of the stages of a run.
+
+    def __init__(self):
+        self.stages = []
+        self.times = {}
+        self.counts = {}
+        self.starts = {}
+        self.t0 = time.perf_counter()
+
+    def start(self, stage):
+        self.starts[stage] = time.perf_counter()
+
+    def stop(self, stage, **counts):
+        self.add(stage, time.perf_counter() - self.starts.pop(stage), counts)
+
+    def add(self, stage, seconds, counts={}):
+        if stage not in self.times:
+            self.stages.append(stage)
+            self.times[stage] = 0.0
+            self.counts[stage] = {}
+        self.times[stage] += seconds
+        for key, value in counts.items():
+            self.counts[stage][key] = self.counts[stage].get(key, 0) + value
+
+    def write(self, df):
+        total = time.perf_counter() - self.t0
+        df.write('%-10s %10s %6s  %s\n' % ('stage', 'time/ms', '%', 'counts'))
+        for stage in self.stages:
+            counts = ', '.join('%s: %d' % (k, v) for k, v in self.counts[stage].items())
+            df.write('%-10s %10.1f %6.1f  %s\n' % (stage, 1000.0*self.times[stage],
+                                                  100.0*self.times[stage]/total, counts))
+        df.write('%-10s %10.1f\n' % ('total', 1000.0*total))
+
+def reduce_report(report, analysis, keep_data, plots=False):
+    # analyze report and drop the raw data that are not needed anymore:
+    report = analyze_report(report, **analysis)
+    if plots:
+        report.plots = plot_histograms(report.data)
+    if not keep_data:
+        report.data = {}
+    return report
+
+def process_report(filename, analysis, keep_data, cache=None, plots=False,
+                   timing=False):
+    # parse and analyze a single file (runs in worker processes):
+    # analysis: keyword arguments for analyze_report()
+    # cache: None (no cache), 'use' or 'rebuild'
+    # plots: compute histograms for plots
+    # timing: add run times and counts of parsing and analysis to the report
+    t0 = time.perf_counter() if timing else 0.0
+    report = None
+    # latency histograms can be built while parsing if no analysis,
+    # plot or caller needs the raw latencies. The cache holds raw data
+    # and is not used then:
+    if analysis['sketch'] is not None and analysis['deadline'] is None and \
+       analysis['spikes'] is None and not keep_data and not plots:
+        cache = None
+        report = parse_report(filename, sketch=analysis['sketch'],
+                              init=analysis['init'])
+    elif cache is not None:
+        stat = os.stat(filename)
+        if cache == 'use':
+            report = load_cached_report(filename, stat)
+    cached = report is not None and cache is not None
+    if report is None:
+        report = parse_report(filename)
+        if cache is not None:
+            save_cached_report(report, stat)
+    if not timing:
+        return reduce_report(report, analysis, keep_data, plots)
+    t1 = time.perf_counter()
+    data = report.data
+    parsing = dict(files=1, cached=int(cached), bytes=os.path.getsize(filename),
+                   lines=sum(len(v) for k, v in data.items()
+                             if k[2] in ['latencies', 'switches']),
+                   samples=sum(len(v) for k, v in data.items()
+                               if k[1:] == ('latency', 'latencies')) +
+                   sum(h.n for h in report.histograms.values()))
+    report = reduce_report(report, analysis, keep_data, plots)
+    report.profile = [('parsing', t1 - t0, parsing),
+                      ('analysis', time.perf_counter() - t1, dict(reports=1))]
+    return report
+
+def add_report(dt, report, add_data):
+    dt.add_value(report.num, 'data>num')
+    dt.add_value(report.param, 'data>kernel parameter')
+    dt.add_value(report.load, 'data>load')
+    dt.add_value(report.latency, 'data>latency')
+    dt.add_value(report.governor, 'data>governor')
+    dt.add_value(report.quality, 'data>quality')
+    dt.add_data(add_data, 'data>')
+    dt.add_value(report.isolcpus, 'data>isolcpus')
+    dt.add_value(report.cpuid, 'data>cpu')
+    dt.add_value(report.temp, 'data>temp')
+    dt.add_value(report.freq, 'data>freq')
+    dt.add_value(report.poll, 'data>poll')
+    for column, value in report.results.items():
+        # databases may contain columns of other analysis options,
+        # column paths are matched exactly and not by substrings:
+        c = dt.col(column)
+        if c is not None and dt.path(c) == column:
+            dt.add_value(value, c)
+    filename = os.path.basename(report.filename)
+    dt.add_value(filename, 'tests>test details')
+    dt.add_value('[test details](%s)' % filename, 'tests>links')
+    dt.fill_data()
+
+def setup_table(add_cols, tails=[], deadline=None, spikes=None):
+    dt = DataTable()
+    dt.add_section('data')
+    add_data = []
+    for a in add_cols:
+        ak, av = a.split('=')
+        dt.add_column(ak, '1', '%-s')
+        add_data.append(av)
+    dt.add_column('num', '1', '%3s')
+    dt.add_column('kernel parameter', '1', '%-5s')
+    dt.add_column('isolcpus', '1', '%-d')
+    dt.add_column('cpu', '1', '%-d')
+    dt.add_column('load', '1', '%-s')
+    dt.add_column('latency', '1', '%-s')
+    dt.add_column('governor', '1', '%-s')
+    dt.add_column('temp', 'C', '%4.1f')
+    dt.add_column('freq', 'GHz', '%5.3f')
+    dt.add_column('poll', '%', '%4.1f')
+    dt.add_column('quality', '1', '%-s')
+    for testmode in ['kern', 'kthreads', 'user']:
+        dt.add_section(testmode+' latencies')
+        dt.add_column('mean jitter', 'ns', '%3.0f')
+        dt.add_column('stdev', 'ns', '%3.0f')
+        dt.add_column('max', 'ns', '%3.0f')
+        dt.add_column('overruns', '1', '%1.0f')
+        dt.add_column('n', 's', '%d')
+        for p in tails:
+            dt.add_column('p%g' % p, 'ns', '%3.0f')
+        if deadline is not None:
+            dt.add_column('misses', '%', '%.4f')
+        if spikes is not None:
+            dt.add_column('spikes', '1', '%d')
+            dt.add_column('burst', 's', '%d')
+            dt.add_column('gap', 's', '%3.0f')
+            dt.add_column('ovburst', 's', '%d')
+        dt.add_section(testmode+' switches')
+        dt.add_column('susp', 'ns', '%3.0f')
+        dt.add_column('sem', 'ns', '%3.0f')
+        dt.add_column('rpc', 'ns', '%3.0f')
+        dt.add_section(testmode+' preempt')
+        dt.add_column('max', 'ns', '%3.0f')
+        dt.add_column('jitfast', 'ns', '%3.0f')
+        dt.add_column('jitslow', 'ns', '%3.0f')
+        dt.add_column('n', '1', '%d')
+    dt.add_section('tests')
+    dt.add_column('test details', '', '%-s')
+    dt.add_column('link', '', '%-s')
+    return dt, add_data
+
+packed_extensions = ['.tar', '.tar.gz', '.tgz', '.tar.xz', '.tar.bz2', '.zip']
+
+def is_packed(filename):
+    return any(filename.endswith(ext) for ext in packed_extensions)
+
+def is_report_member(name):
+    name = os.path.basename(name)
+    return name.startswith('latencies-') and not is_packed(name) and \
+        not is_archive(name) and not is_database(name)
+
+def read_member(name, sf):
+    # content of a member of a tar or zip file:
+    if report_name(name) != name:
+        with open_compressed(name, sf) as cf:
+            return read_stream(cf)
+    return read_stream(sf)
+
+def load_packed(filename):
+    # generator of parsed reports in a tar or zip file,
+    # the members are read as streams without extracting them:
+    if filename.endswith('.zip'):
+        import zipfile
+        with zipfile.ZipFile(filename) as zf:
+            infos = [info for info in zf.infolist()
+                     if not info.is_dir() and is_report_member(info.filename)]
+            for info in sorted(infos, key=lambda info: info.filename):
+                with zf.open(info) as sf:
+                    buf = read_member(info.filename, sf)
+                yield parse_report(os.path.join(filename, info.filename), buf)
+    else:
+        import tarfile
+        # sequential access, members are in the order of the tar file:
+        with tarfile.open(filename, 'r|*') as tf:
+            for member in tf:
+                if not member.isfile() or not is_report_member(member.name):
+                    continue
+                sf = tf.extractfile(member)
+                buf = read_member(member.name, sf)
+                yield parse_report(os.path.join(filename, member.name), buf)
+
+def input_type(filename):
+    if is_packed(filename):
+        return 'packed'
+    if is_archive(filename):
+        return 'archive'
+    if is_database(filename):
+        return 'database'
+    return 'report'
+
+class ReportParser:
+    # parses and analyzes test reports, databases, archives and packed files
+    # and yields a Report for each test report.
+    # init, outlier, sketch, tails, deadline, spikes, window:
+    # options of analyze_report()
+    # reduce: drop the raw data of each report right after its analysis
+    # cache: None, 'use' or 'rebuild' the cache of parsed files
+    # cache_size: maximum size of each cache directory in megabytes
+    # jobs: number of processes parsing the files, all cpus if 0
+    # where: sql condition selecting the reports of databases
+    # plots: compute the histograms for plotting
+    # timing: add run times and counts of parsing and analysis
+
+    def __init__(self, init=10, outlier=0.0, sketch=None, tails=[],
+                 deadline=None, spikes=None, window=10, reduce=True,
+                 cache=None, cache_size=256, jobs=1, where='', plots=False,
+                 timing=False):
+        self.analysis = dict(init=init, outlier=outlier, sketch=sketch,
+                             tails=tails, deadline=deadline, spikes=spikes,
+                             window=window)
+        self.keep_data = not reduce
+        self.cache = cache
+        self.cache_size = cache_size
+        self.jobs = jobs if jobs > 0 else os.cpu_count() or 1
+        self.where = where
+        self.plots = plots
+        self.timing = timing
+
+    def parse(self, filename):
+        # analyzed report of a single test report file:
+        return process_report(filename, self.analysis, self.keep_data,
+                              self.cache, self.plots, self.timing)
+
+    def reports(self, files):
+        # generator of analyzed reports in the order of files.
+        # with reduce only the reports of a single pool chunk are
+        # held in memory:
+        worker = functools.partial(process_report, analysis=self.analysis,
+                                   keep_data=self.keep_data, cache=self.cache,
+                                   plots=self.plots, timing=self.timing)
+        files = list(files)
+        for kind, group in itertools.groupby(files, input_type):
+            group = list(group)
+            if kind == 'database':
+                # databases contain the analyzed results only:
+                for filename in group:
+                    for report in load_database(filename, self.where):
+                        yield report
+            elif kind in ['packed', 'archive']:
+                load = load_packed if kind == 'packed' else load_archive
+                for filename in group:
+                    reports = (reduce_report(report, self.analysis,
+                                             self.keep_data, self.plots)
+                               for report in load(filename))
+                    if kind == 'packed':
+                        # tar members are read in the order of the archive,
+                        # the reduced reports are sorted by name like the
+                        # files of a directory:
+                        reports = sorted(reports, key=lambda r: r.filename)
+                    for report in reports:
+                        yield report
+            elif self.jobs == 1 or len(group) < 2:
+                for filename in group:
+                    yield worker(filename)
+            else:
+                import multiprocessing
+                pool = multiprocessing.Pool(self.jobs)
+                try:
+                    chunksize = max(1, len(group)//(4*self.jobs))
+                    for report in pool.imap(worker, group, chunksize):
+                        yield report
+                finally:
+                    pool.terminate()
+        # limit size of the caches of all files:
+        if self.cache is not None:
+            for cachedir in set(os.path.join(os.path.dirname(f), cache_dirname)
+                                for f in files if input_type(f) == 'report'):
+                prune_cache(cachedir, self.cache_size*1024*1024)
+
+def read_reports(files, **options):
+    # generator of analyzed reports, options as for ReportParser:
+    return ReportParser(**options).reports(files)
+
+
+def group_codes(dt, c):
+    # integer codes of the values of column c, missing values are -1:
+    values = dt.values(c)
+    isnan = dt.is_missing(c)
+    codes = np.full(len(values), -1, dtype=np.int64)
+    if np.any(~isnan):
+        uniques, codes[~isnan] = np.unique(values[~isnan], return_inverse=True)
+    return codes
+
+def group_table(dt, columns, histograms=None):
+    # new table with rows of equal values in columns combined.
+    # histograms: latency histograms by testmode of each row (--sketch),
+    # percentiles of groups are then computed from the merged histograms:
+    keys = [dt.col(c) for c in columns]
+    if None in keys:
+        print('group column ' + columns[keys.index(None)] + ' not found')
+        keys = [k for k in keys if k is not None]
+    rows = dt.rows()
+    codes = np.zeros(rows, dtype=np.int64)
+    for c in keys:
+        kc = group_codes(dt, c) + 1
+        codes = codes*(np.max(kc, initial=0) + 1) + kc
+    # groups in order of first appearance:
+    uniques, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    groups = np.argsort(order)[inverse]
+    ngroups = len(uniques)
+    counts = np.bincount(groups, minlength=ngroups)
+    firstrows = first[order]
+
+    def weighted(values, weights):
+        # weighted sums of non-missing values per group:
+        sel = ~np.isnan(values) & ~np.isnan(weights)
+        w = np.bincount(groups[sel], weights=weights[sel], minlength=ngroups)
+        s = np.bincount(groups[sel], weights=(weights*values)[sel], minlength=ngroups)
+        return s, w
+
+    def unique_values(c):
+        # value if it is the same for all rows of a group, missing otherwise:
+        kc = group_codes(dt, c)
+        lo = np.full(ngroups, np.iinfo(np.int64).max)
+        hi = np.full(ngroups, -1)
+        np.minimum.at(lo, groups, kc)
+        np.maximum.at(hi, groups, kc)
+        isnan = dt.is_missing(c)[firstrows] | (lo != hi)
+        return dt.values(c)[firstrows], isnan
+
+    # first column of the section of each column and columns by label:
+    sections = []
+    section_cols = {}
+    for c in range(dt.columns()):
+        if len(dt.header[c]) > 1 or c == 0:
+            section = c
+        sections.append(section)
+        section_cols[(section, dt.header[c][0])] = c
+
+    # combine columns:
+    results = {}
+    for c in range(dt.columns()):
+        label = dt.header[c][0]
+        values = dt.values(c)
+        if c in keys or dt.valid[c] is not None or \
+           (dt.header[sections[c]][1:2] == ['data'] and label not in ['temp', 'freq', 'poll']):
+            results[c] = unique_values(c)
+        elif label in ['max', 'jitfast', 'jitslow', 'overruns', 'burst', 'ovburst'] or \
+             re.match(r'p[0-9.]+$', label):
+            # maximum of maxima, overruns are the maximum per line.
+            # Percentiles are p followed by a number, not e.g. poll:
+            maxv = np.full(ngroups, np.nan)
+            np.fmax.at(maxv, groups, values)
+            results[c] = (maxv, np.isnan(maxv))
+        elif label in ['n', 'spikes']:
+            s, w = weighted(values, np.ones(rows))
+            results[c] = (s, w == 0)
+        elif label in ['mean jitter', 'stdev', 'misses']:
+            # pool with the number of samples of each run:
+            n = dt.values(section_cols[(sections[c], 'n')])
+            if label == 'stdev':
+                means = dt.values(section_cols[(sections[c], 'mean jitter')])
+                s, w = weighted(means, n)
+                mean = s/np.where(w > 0, w, 1)
+                # pooled variance from mergeable moments:
+                s, w = weighted(values**2 + (means - mean[groups])**2, n)
+                results[c] = (np.sqrt(s/np.where(w > 0, w, 1)), w == 0)
+            else:
+                s, w = weighted(values, n)
+                results[c] = (s/np.where(w > 0, w, 1), w == 0)
+        else:
+            s, w = weighted(values, np.ones(rows))
+            results[c] = (s/np.where(w > 0, w, 1), w == 0)
+
+    if histograms is not None:
+        # merge the histograms of each group:
+        pooled = {}
+        for testmode in ['kern', 'kthreads', 'user']:
+            merged = [LatencyHistogram() for g in range(ngroups)]
+            nhists = np.zeros(ngroups, dtype=np.int64)
+            for row, hists in enumerate(histograms):
+                if testmode in hists:
+                    g = groups[row]
+                    if nhists[g] == 0:
+                        merged[g] = LatencyHistogram(hists[testmode].precision)
+                    merged[g].merge(hists[testmode])
+                    nhists[g] += 1
+            pooled[testmode + ' latencies'] = (merged, nhists)
+        for c in range(dt.columns()):
+            section = dt.header[sections[c]][1:2]
+            if len(section) == 0 or section[0] not in pooled or \
+               not re.match(r'p[0-9.]+$', dt.header[c][0]):
+                continue
+            merged, nhists = pooled[section[0]]
+            # groups with a histogram for each of their values,
+            # e.g. not for reports from databases:
+            nvalues = np.bincount(groups[~dt.is_missing(c)], minlength=ngroups)
+            p = float(dt.header[c][0][1:])
+            values, isnan = results[c]
+            for g in np.flatnonzero((nhists == nvalues) & (nhists > 0)):
+                values[g] = merged[g].quantile([p])[0]
+            results[c] = (values, np.isnan(values))
+
+    # new table with same columns:
+    gt = DataTable()
+    for c in range(dt.columns()):
+        for section in reversed(dt.header[c][1:]):
+            gt.add_section(section)
+        if c == 0:
+            gt.add_column('runs', '1', '%d')
+        gt.add_column(dt.header[c][0], dt.units[c], dt.formats[c])
+    for g in range(ngroups):
+        gt.add_value(counts[g], 0)
+        for c in range(dt.columns()):
+            values, isnan = results[c]
+            gt.add_value(float('NaN') if isnan[g] else values[g], c+1)
+        gt.fill_data()
+    return gt
+
+def write_table(dt, df, sort_columns, hide_cols, select_cols,
+                table_format, units, number_cols, missing, group_columns=[],
+                histograms=None):
+    # histograms: latency histograms of each row for grouping (--sketch)
+    if len(group_columns) > 0:
+        dt = group_table(dt, group_columns, histograms)
+    dt.show_all()
+    dt.hide_empty_columns()
+    dt.adjust_columns()
+    dt.sort(sort_columns)
+    for hs in hide_cols:
+        dt.hide(hs.replace('_', ' ').replace(':', '>'))
+    if len(select_cols) > 0:
+        dt.hide_all()
+        for ss in select_cols:
+            dt.show(ss.replace('_', ' ').replace(':', '>'))
+    dt.write(df, number_cols=number_cols, table_format=table_format,
+             units=units, missing=missing)
+    return dt
+
+def count_statistics(values, counts, tails):
+    # mean, maximum, percentiles and maximum of sorted distinct values
+    # for each row of counts:
+    n = np.sum(counts[0])
+    stats = [counts @ values / n]
+    # last value with non-zero count:
+    last = counts.shape[1] - 1 - np.argmax(counts[:, ::-1] > 0, axis=1)
+    stats.append(values[last])
+    if len(tails) > 0:
+        # percentiles interpolated between ranks like np.percentile():
+        cum = np.cumsum(counts, axis=1)
+        ranks = np.asarray(tails, dtype=float)*0.01*(n-1)
+        lower = np.floor(ranks)
+        upper = np.ceil(ranks)
+        for r, l, u in zip(ranks, lower, upper):
+            vl = values[np.sum(cum <= l, axis=1)]
+            vu = values[np.sum(cum <= u, axis=1)]
+            stats.append(vl + (r - l)*(vu - vl))
+    return stats
+
+def bootstrap_statistics(data, tails, samples, rng):
+    # statistics of data and of samples bootstrap resamples of data.
+    # Drawing len(data) values with replacement is a multinomial draw
+    # over the distinct values, so all resamples are one array of counts.
+    # Large arrays are split into blocks of resamples:
+    values, counts = np.unique(data, return_counts=True)
+    values = values.astype(float)
+    if len(values) > 4096:
+        # the multinomial draw is linear in the distinct values, merge
+        # them into 4096 bins represented by their mean value:
+        bins = ((values - values[0])*(4095/(values[-1] - values[0]))).astype(int)
+        bins, inverse = np.unique(bins, return_inverse=True)
+        sums = np.bincount(inverse, weights=values*counts)
+        counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        values = sums/counts
+    # point estimates from the raw data, the bins are only used for resampling:
+    stats = [np.mean(data), np.max(data)]
+    if len(tails) > 0:
+        stats.extend(partial_percentiles(data, tails)[0])
+    block = max(1, (1 << 22)//len(values))
+    resamples = [count_statistics(values, rng.multinomial(len(data), counts/len(data),
+                                                          size=min(block, samples - k)), tails)
+                 for k in range(0, samples, block)]
+    return [(s, np.concatenate([r[i] for r in resamples]))
+            for i, s in enumerate(stats)]
+
+def compare_data(reports, testmode, init):
+    # pooled latencies and overruns of a test mode of all reports:
+    latencies = []
+    overruns = []
+    for report in reports:
+        if (testmode, 'latency', 'latencies') in report.data:
+            latencies.append(report.data[testmode, 'latency', 'latencies'][init:])
+            overruns.append(np.diff(report.data[testmode, 'latency', 'overruns'])[init:])
+    if len(latencies) == 0:
+        return None, None
+    return np.concatenate(latencies), np.concatenate(overruns)
+
+def compare_reports(baseline, candidate, init, tails, threshold,
+                    samples=1000, confidence=95.0, seed=0):
+    # table of differences between the latency tests of candidate and
+    # baseline reports with bootstrap confidence intervals.
+    # threshold: relative increase in percent that is a regression
+    # if it is exceeded by the lower end of the confidence interval.
+    # Returns the table and the number of regressions.
+    rng = np.random.default_rng(seed)
+    dt = DataTable()
+    dt.add_section('test')
+    dt.add_column('mode', '1', '%-s')
+    dt.add_column('metric', '1', '%-s')
+    dt.add_section('baseline')
+    dt.add_column('value', 'ns', '%3.0f')
+    dt.add_section('candidate')
+    dt.add_column('value', 'ns', '%3.0f')
+    dt.add_section('difference')
+    dt.add_column('value', 'ns', '%3.0f')
+    dt.add_column('low', 'ns', '%3.0f')
+    dt.add_column('high', 'ns', '%3.0f')
+    dt.add_column('change', '%', '%5.1f')
+    dt.add_section('result')
+    dt.add_column('regression', '1', '%-s')
+    metrics = ['mean jitter', 'max'] + ['p%g' % p for p in tails]
+    ci = [0.5*(100.0 - confidence), 0.5*(100.0 + confidence)]
+    regressions = 0
+    for testmode in ['kern', 'kthreads', 'user']:
+        base = compare_data(baseline, testmode, init)
+        cand = compare_data(candidate, testmode, init)
+        if base[0] is None or cand[0] is None or len(base[0]) == 0 or len(cand[0]) == 0:
+            continue
+        # overruns per line are compared by their maximum like in the table:
+        stats = [zip(metrics + ['overruns'],
+                     bootstrap_statistics(b, tails, samples, rng) +
+                     bootstrap_statistics(o, [], samples, rng)[1:2])
+                 for b, o in [base, cand]]
+        for (metric, (bv, bs)), (_, (cv, cs)) in zip(*stats):
+            low, high = np.percentile(cs - bs, ci)
+            diff = cv - bv
+            change = 100.0*diff/bv if bv != 0 else float('NaN')
+            # significant increase by more than threshold:
+            regression = low > 0.01*threshold*abs(bv)
+            regressions += regression
+            dt.add_data([testmode, metric, bv, cv, diff, low, high,
+                         change, 'yes' if regression else 'no'], 0)
+    return dt, regressions
+
+def find_reports(names):
+    # report files of names that are files or directories:
+    files = []
+    for name in names:
+        if os.path.isfile(name):
+            files.append(name)
+        elif os.path.isdir(name):
+            files.extend(sorted(glob.glob(os.path.join(name, 'latencies-*'))))
+        else:
+            print('file "' + name + '" does not exist.')
+    return files
+
+def watch_reports(directory, dt, add_data, reader, interval, render):
+    # poll directory and update table with new or changed files:
+    stats = {}
+    rows = []
+    while True:
+        changed = []
+        for filename in sorted(glob.glob(os.path.join(directory, 'latencies-*'))):
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            if stats.get(filename) != (stat.st_size, stat.st_mtime_ns):
+                stats[filename] = (stat.st_size, stat.st_mtime_ns)
+                changed.append(filename)
+        if len(changed) > 0:
+            for report in reader.reports(changed):
+                if report.filename in rows:
+                    # replace row of a file that has been changed:
+                    row = rows.index(report.filename)
+                    dt.remove_row(row)
+                    del rows[row]
+                add_report(dt, report, add_data)
+                rows.append(report.filename)
+            if sys.stdout.isatty():
+                # clear screen:
+                sys.stdout.write('\033[H\033[2J')
+            render(dt)
+            sys.stdout.flush()
+        time.sleep(interval)
+
+plot_precision = 0.035
+
+def plot_histograms(data):
+    # histograms of the latencies of each test mode for plots:
+    hists = {}
+    for testmode in ['kern', 'kthreads', 'user']:
+        if (testmode, 'latency', 'latencies') in data:
+            hists[testmode] = LatencyHistogram(plot_precision).add(
+                data[testmode, 'latency', 'latencies'])
+    return hists
+
+def import_pyplot(plotfile=None):
+    # matplotlib is only imported when plots are requested.
+    # plots saved to a file do not need a display (and python-tk):
+    import matplotlib
+    if plotfile is not None:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def plot_testmode(testmode, curves, plotfile=None):
+    # histograms and complementary cumulative distributions
+    # of the latencies of one test mode:
+    plt = import_pyplot(plotfile)
+    from matplotlib.collections import LineCollection
+    fig, (ax, cax) = plt.subplots(1, 2, figsize=(10, 3.5), dpi=80)
+    labels = []
+    hlines = []
+    clines = []
+    for label, hists in curves:
+        if testmode not in hists or len(hists[testmode].counts) == 0:
+            continue
+        hist = hists[testmode]
+        edges = hist.gamma**(np.arange(len(hist.counts) + 1) + hist.offset)
+        # outline of the histogram, empty bins below the axis:
+        counts = np.where(hist.counts > 0, hist.counts, 0.1)
+        hlines.append(np.column_stack((np.repeat(edges, 2)[1:-1],
+                                       np.repeat(counts, 2))))
+        # fraction of latencies exceeding the upper bin edges:
+        survival = (hist.n - hist.zeros - np.cumsum(hist.counts))/hist.n
+        survival = np.concatenate(([1.0 - hist.zeros/hist.n], survival))
+        sel = survival > 0.0
+        clines.append(np.column_stack((np.repeat(edges[sel], 2)[1:],
+                                       np.repeat(survival[sel], 2)[:-1])))
+        labels.append(label)
+    # a single artist for all files, one artist per file is slow:
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    colors = [colors[k % len(colors)] for k in range(len(labels))]
+    for a, lines in [(ax, hlines), (cax, clines)]:
+        a.set_title(testmode + ' latencies')
+        a.set_xscale('log')
+        a.set_xlabel('Jitter [ns]')
+        a.set_yscale('log', nonpositive='clip')
+        if len(lines) > 0:
+            a.add_collection(LineCollection(lines, colors=colors))
+            a.set_xlim(min(l[0, 0] for l in lines), max(l[-1, 0] for l in lines))
+    if len(hlines) > 0:
+        ax.set_ylim(0.5, 2.0*max(np.max(l[:, 1]) for l in hlines))
+        cax.set_ylim(0.5*min(l[-1, 1] for l in clines), 1.5)
+    ax.set_ylabel('Count')
+    cax.set_ylabel('Fraction exceeding jitter')
+    # legends of many runs would cover the data:
+    if 0 < len(labels) <= 20:
+        handles = [plt.Line2D([], [], color=c) for c in colors]
+        cax.legend(handles, labels, loc='lower left', fontsize='small')
+    fig.tight_layout()
+    if plotfile is not None:
+        fig.savefig(plotfile)
+        plt.close(fig)
+
+def plot_reports(curves, plotfile=None, jobs=1):
+    # one figure for each test mode,
+    # saved to plotfile with the test mode appended to its name:
+    testmodes = [testmode for testmode in ['kern', 'kthreads', 'user']
+                 if any(testmode in hists for label, hists in curves)]
+    if plotfile is None:
+        for testmode in testmodes:
+            plot_testmode(testmode, curves)
+        import_pyplot().show()
+        return
+    root, ext = os.path.splitext(plotfile)
+    tasks = [(testmode, curves, '%s-%s%s' % (root, testmode, ext or '.png'))
+             for testmode in testmodes]
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(tasks) < 2:
+        for task in tasks:
+            plot_testmode(*task)
+    else:
+        import multiprocessing
+        with multiprocessing.Pool(min(jobs, len(tasks))) as pool:
+            pool.starmap(plot_testmode, tasks)
+
+def plot_trend(runs, plotfile):
+    # mean jitter and maximum latencies of each test mode
+    # over the runs of a configuration:
+    plt = import_pyplot(plotfile)
+    fig, ax = plt.subplots(figsize=(10, 3.5), dpi=80)
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    x = np.arange(len(runs))
+    for k, testmode in enumerate(['kern', 'kthreads', 'user']):
+        for name, style in [('mean jitter', 'o-'), ('max', 's--')]:
+            y = [r.results.get('%s latencies>%s' % (testmode, name), float('NaN'))
+                 for r in runs]
+            if np.all(np.isnan(y)):
+                continue
+            ax.plot(x, y, style, color=colors[k % len(colors)],
+                    label='%s %s' % (testmode, name))
+    ax.set_xticks(x)
+    if len(set(r.kernel for r in runs)) > 1:
+        ax.set_xticklabels(['%s %s' % (r.kernel, r.num) for r in runs],
+                           fontsize='small', rotation=30, ha='right')
+    else:
+        ax.set_xticklabels([r.num for r in runs], fontsize='small')
+        ax.set_xlabel('Run')
+    ax.set_yscale('log', nonpositive='clip')
+    ax.set_ylabel('Jitter [ns]')
+    if len(ax.lines) > 0:
+        ax.legend(loc='upper left', fontsize='small')
+    fig.tight_layout()
+    fig.savefig(plotfile)
+    plt.close(fig)
+
+site_manifest = 'manifest.json'
+
+site_style = '''body { font-family: sans-serif; margin: 1em 2em; }
+table { border-collapse: collapse; font-size: small; }
+th, td { padding: 2px 6px; border-bottom: 1px solid #ddd; white-space: nowrap; }
+thead tr:last-child th { cursor: pointer; }
+pre { background: #f4f4f4; padding: 0.5em; overflow-x: auto; }
+img { max-width: 100%; }
+'''
+
+# sorts table rows by the clicked column of the last header row,
+# numbers numerically, missing values last:
+site_script = '''<script>
+document.querySelectorAll('thead tr:last-child th').forEach(function(th, col) {
+  th.addEventListener('click', function() {
+    var tbody = th.closest('table').tBodies[0];
+    var dir = th.dataset.dir == 'up' ? -1 : 1;
+    th.dataset.dir = dir > 0 ? 'up' : 'down';
+    var rows = Array.from(tbody.rows);
+    rows.sort(function(a, b) {
+      var x = a.cells[col].textContent.trim(), y = b.cells[col].textContent.trim();
+      var u = parseFloat(x), v = parseFloat(y);
+      if (isNaN(u) != isNaN(v)) return isNaN(u) ? 1 : -1;
+      if (!isNaN(u)) return dir*(u - v);
+      return dir*x.localeCompare(y);
+    });
+    rows.forEach(function(row) { tbody.appendChild(row); });
+  });
+});
+</script>
+'''
+
+def write_page(filename, title, body, root=''):
+    # html page of the site, root is the path to the index page:
+    with open(filename, 'w') as df:
+        df.write('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n')
+        df.write('<title>%s</title>\n' % html.escape(title))
+        df.write('<style>\n%s</style>\n</head>\n<body>\n' % site_style)
+        if root:
+            df.write('<p><a href="%sindex.html">all runs</a></p>\n' % root)
+        df.write('<h1>%s</h1>\n' % html.escape(title))
+        df.write(''.join(body))
+        df.write(site_script)
+        df.write('</body>\n</html>\n')
+
+def html_table(dt, links={}, sort_columns=[], hide_cols=[]):
+    # html of a table with cells in links turned into links:
+    df = io.StringIO()
+    write_table(dt, df, sort_columns, hide_cols, [], 'html', 'header', None, '-')
+    def link(m):
+        if m.group(2) not in links:
+            return m.group()
+        return '%s<a href="%s">%s</a></td>' % (m.group(1), links[m.group(2)], m.group(2))
+    return re.sub(r'(<td align="left">)([^<]*)</td>', link, df.getvalue())
+
+def file_hash(filename, previous=None):
+    # size, modification time and sha1 of the content of filename.
+    # The hash of previous is reused if size and time did not change:
+    stat = os.stat(filename)
+    if previous is not None and previous['size'] == stat.st_size and \
+       previous['mtime'] == stat.st_mtime_ns:
+        return previous
+    sha = hashlib.sha1()
+    with open(filename, 'rb') as sf:
+        for chunk in iter(lambda: sf.read(1 << 20), b''):
+            sha.update(chunk)
+    return dict(size=stat.st_size, mtime=stat.st_mtime_ns, hash=sha.hexdigest())
+
+def report_environment(filename):
+    # lines of the environment sections of a report file:
+    buf = read_report(filename)
+    end = buf.find(b'Loaded modules')
+    if end < 0:
+        end = len(buf)
+    eol = buf.find(b'\n', end)
+    sections = {}
+    if end < len(buf) and eol >= 0:
+        sections = index_sections(buf, eol+1)
+    environment = [(header.decode(), section_lines(buf, sections, header))
+                   for header in section_headers]
+    if isinstance(buf, mmap.mmap):
+        buf.close()
+    return environment
+
+def site_reports(reader, files):
+    # analyzed reports together with the input file they are read from:
+    for kind, group in itertools.groupby(files, input_type):
+        group = list(group)
+        if kind == 'report':
+            for filename, report in zip(group, reader.reports(group)):
+                yield filename, report
+        else:
+            for filename in group:
+                for report in reader.reports([filename]):
+                    yield filename, report
+
+def write_run_page(directory, page, report, source, dt, config, plots):
+    # page of a single run with its results, histograms and environment.
+    # plots: list to which the arguments of plot_testmode() for the
+    # histograms are appended, no histograms if None.
+    # Returns the files of the page:
+    name = os.path.basename(report_name(report.filename))
+    body = ['<p>configuration <a href="../configs/%s.html">%s</a></p>\n'
+            % (config, html.escape(config))]
+    body.append('<h2>Run</h2>\n<table>\n')
+    for key, value in report.metadata().items():
+        if key != 'filename':
+            body.append('  <tr><th align="left">%s</th><td>%s</td></tr>\n'
+                        % (key, html.escape(str(value))))
+    body.append('</table>\n<h2>Results</h2>\n<table>\n')
+    body.append('<thead><tr><th align="left">test</th><th align="left">result</th>'
+                '<th align="right">value</th><th align="left">unit</th></tr></thead>\n<tbody>\n')
+    for column, value in report.results.items():
+        c = dt.col(column)
+        if c is None or m.isnan(value):
+            continue
+        section, label = column.split('>')
+        unit = dt.units[c] if dt.units[c] != '1' else ''
+        body.append('  <tr><td>%s</td><td>%s</td><td align="right">%s</td><td>%s</td></tr>\n'
+                    % (section, label, dt.formats[c] % value, unit))
+    body.append('</tbody>\n</table>\n')
+    files = [page]
+    if plots is not None and len(report.plots) > 0:
+        body.append('<h2>Histograms</h2>\n')
+        for testmode in ['kern', 'kthreads', 'user']:
+            if testmode in report.plots:
+                png = '%s-%s.png' % (name, testmode)
+                plots.append((testmode, [(name, report.plots)],
+                              os.path.join(directory, 'runs', png)))
+                body.append('<p><img src="%s" alt="%s latencies"></p>\n' % (png, testmode))
+                files.append(os.path.join('runs', png))
+    body.append('<h2>Environment</h2>\n')
+    if input_type(source) != 'report':
+        body.append('<p>not available for reports read from %s</p>\n'
+                    % html.escape(os.path.basename(source)))
+    else:
+        for header, lines in report_environment(source):
+            if len(lines) > 0:
+                body.append('<h3>%s</h3>\n<pre>%s</pre>\n'
+                            % (header, html.escape('\n'.join(lines))))
+    write_page(os.path.join(directory, page), name, body, '../')
+    return files
+
+def write_config_page(directory, page, config, runs, plots):
+    # trend of the results over the runs of a configuration,
+    # returns the files written:
+    dt = DataTable()
+    dt.add_section('run')
+    dt.add_column('num', '1', '%3s')
+    dt.add_column('kernel', '1', '%-s')
+    dt.add_column('date', '1', '%-s')
+    dt.add_column('quality', '1', '%-s')
+    dt.add_column('temp', 'C', '%4.1f')
+    names = ['mean jitter', 'max', 'overruns']
+    for testmode in ['kern', 'kthreads', 'user']:
+        dt.add_section(testmode + ' latencies')
+        dt.add_column('mean jitter', 'ns', '%3.0f')
+        dt.add_column('max', 'ns', '%3.0f')
+        dt.add_column('overruns', '1', '%1.0f')
+    dt.add_section('tests')
+    dt.add_column('test details', '', '%-s')
+    links = {}
+    for report in runs:
+        name = os.path.basename(report_name(report.filename))
+        links[name] = '../runs/%s.html' % name
+        dt.add_data([report.num, report.kernel, report.date, report.quality,
+                     report.temp] +
+                    [report.results.get('%s latencies>%s' % (testmode, n), float('NaN'))
+                     for testmode in ['kern', 'kthreads', 'user'] for n in names] +
+                    [name], 0)
+    body = []
+    files = [page]
+    if plots and len(runs) > 1:
+        png = config + '.png'
+        plot_trend(runs, os.path.join(directory, 'configs', png))
+        body.append('<p><img src="%s" alt="trend"></p>\n' % png)
+        files.append(os.path.join('configs', png))
+    body.append(html_table(dt, links))
+    write_page(os.path.join(directory, page), config, body, '../')
+    return files
+
+def remove_pages(directory, files):
+    for filename in files:
+        try:
+            os.remove(os.path.join(directory, filename))
+        except OSError:
+            pass
+
+def build_site(directory, files, reader, dt, add_data):
+    # static html site with an index of all reports, a page for each run
+    # and a trend page for each configuration (host and test parameter).
+    # Only pages of new or changed reports and configurations are written,
+    # based on the content hashes in the manifest of the previous build.
+    # Returns the number of written run and configuration pages:
+    try:
+        with open(os.path.join(directory, site_manifest)) as mf:
+            manifest = json.load(mf)
+    except (OSError, ValueError):
+        manifest = {}
+    # changed analysis options change all pages:
+    rebuild = manifest.get('analysis') != json.loads(json.dumps(reader.analysis))
+    old_inputs = manifest.get('inputs', {})
+    old_runs = manifest.get('runs', {})
+    old_configs = manifest.get('configs', {})
+    for subdir in ['runs', 'configs']:
+        os.makedirs(os.path.join(directory, subdir), exist_ok=True)
+    try:
+        # plots are saved to files:
+        import_pyplot('index.html')
+        plots = True
+    except ImportError:
+        plots = False
+    reader.plots = plots
+
+    inputs = dict((filename, file_hash(filename, old_inputs.get(filename)))
+                  for filename in files)
+    runs = {}
+    members = {}
+    written = [0, 0]
+    tasks = [] if plots else None
+    for source, report in site_reports(reader, files):
+        add_report(dt, report, add_data)
+        name = os.path.basename(report_name(report.filename))
+        config = '-'.join([report.host] + name.split('-')[9:-1])
+        run = dict(hash=inputs[source]['hash'], page='runs/%s.html' % name,
+                   config=config)
+        old = old_runs.get(report.filename)
+        if rebuild or old is None or old['hash'] != run['hash'] or \
+           not os.path.exists(os.path.join(directory, old['page'])):
+            run['files'] = write_run_page(directory, run['page'], report,
+                                          source, dt, config, tasks)
+            written[0] += 1
+        else:
+            run['files'] = old['files']
+        runs[report.filename] = run
+        # the histograms are only needed by the plot tasks:
+        report.plots = {}
+        members.setdefault(config, []).append(report)
+    if tasks:
+        if reader.jobs == 1 or len(tasks) < 2:
+            for task in tasks:
+                plot_testmode(*task)
+        else:
+            import multiprocessing
+            with multiprocessing.Pool(min(reader.jobs, len(tasks))) as pool:
+                pool.starmap(plot_testmode, tasks)
+    configs = {}
+    for config, reports in members.items():
+        reports.sort(key=lambda r: (r.date, r.num, r.kernel))
+        entry = dict(page='configs/%s.html' % config,
+                     runs=[[r.filename, runs[r.filename]['hash']] for r in reports])
+        old = old_configs.get(config)
+        if rebuild or old is None or old['runs'] != entry['runs'] or \
+           not os.path.exists(os.path.join(directory, old['page'])):
+            entry['files'] = write_config_page(directory, entry['page'], config,
+                                               reports, plots)
+            written[1] += 1
+        else:
+            entry['files'] = old['files']
+        configs[config] = entry
+    # pages of removed reports:
+    for filename, run in old_runs.items():
+        if filename not in runs:
+            remove_pages(directory, [f for f in run['files']
+                                     if all(f not in r['files'] for r in runs.values())])
+    for config, entry in old_configs.items():
+        if config not in configs:
+            remove_pages(directory, entry['files'])
+
+    # index page:
+    links = dict((os.path.basename(report_name(filename)), run['page'])
+                 for filename, run in runs.items())
+    body = ['<p>%d runs, updated %s</p>\n' % (len(runs), time.strftime('%Y-%m-%d %H:%M'))]
+    body.append(html_table(dt, links, ['tests>test details'], ['tests>link']))
+    body.append('<h2>Configurations</h2>\n<ul>\n')
+    for config in sorted(configs):
+        body.append('  <li><a href="%s">%s</a> (%d)</li>\n'
+                    % (configs[config]['page'], html.escape(config),
+                       len(configs[config]['runs'])))
+    body.append('</ul>\n')
+    write_page(os.path.join(directory, 'index.html'), 'RTAI test results', body)
+
+    manifest = dict(analysis=reader.analysis, inputs=inputs, runs=runs,
+                    configs=configs)
+    with open(os.path.join(directory, site_manifest + '.tmp'), 'w') as mf:
+        json.dump(manifest, mf, indent=1, sort_keys=True)
+    os.replace(os.path.join(directory, site_manifest + '.tmp'),
+               os.path.join(directory, site_manifest))
+    return written
+
+awk_number = re.compile(rb'[ \t]*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?')
+awk_separator = re.compile(rb'\|[ ]*')
+
+def awk_fields(row, columns, separator=awk_separator):
+    # numbers of the awk fields $columns of row, 0 if not a number:
+    fields = separator.split(row)
+    values = []
+    for c in columns:
+        v = awk_number.match(fields[c-1]) if c <= len(fields) else None
+        values.append(float(v.group()) if v is not None else 0.0)
+    return values
+
+def results_lines(filename, pattern=b'RTD'):
+    # lines of a results file containing pattern:
+    with open(filename, 'rb') as sf:
+        return [line.rstrip(b'\n') for line in sf if pattern in line]
+
+def warmup_line(n):
+    # first line of n RTD lines used by test_result and test_save:
+    if n < 20:
+        return 1
+    if n < 60:
+        return 10
+    return 20
+
+def summarize_quality(testmode, directory='.'):
+    # quality of the latency test of testmode like test_result:
+    filename = os.path.join(directory, 'results-%s-latency.dat' % testmode)
+    if not testmode or not os.path.isfile(filename):
+        return 'missing'
+    rows = results_lines(filename)
+    if len(rows) < 1:
+        return 'failed'
+    line = warmup_line(len(rows))
+    values = [awk_fields(row, [2, 5, 7]) for row in rows[line-1:]]
+    # the shell compares the formatted values:
+    latency = int('%.0f' % max(latmax - latmin for latmin, latmax, ors in values))
+    overruns = int((values[-1][2] if len(values) > 1 else 0.0) - values[0][2])
+    if overruns > 0:
+        return 'failed'
+    if latency > 20000:
+        return 'bad'
+    if latency > 10000:
+        return 'ok'
+    if latency > 2000:
+        return 'good'
+    return 'perfect'
+
+def summarize_tests(name, report, tested, progress, directory='.'):
+    # RTH/RTD summary of the results-*.dat files like test_save,
+    # jitter is lat max - lat min as in add_test_data():
+    s = 'Test summary (in nanoseconds):\n\n'
+    s += 'RTH| %-50s| ' % 'general'
+    for td in ['kern', 'kthreads', 'user']:
+        s += '%-41s| %-19s| %-31s| ' % (td + ' latencies', td + ' switches', td + ' preempt')
+    s += 'kernel\n'
+    s += 'RTH| %-40s| %-8s| ' % ('description', 'progress')
+    for td in ['kern', 'kthreads', 'user']:
+        s += '%7s| %7s| %7s| %5s| %7s| %5s| %5s| %5s| %9s| %9s| %9s| ' % \
+            ('ovlmax', 'avgmax', 'std', 'n', 'maxover', 'susp', 'sem', 'rpc',
+             'max', 'jitfast', 'jitslow')
+    s += 'configuration\n'
+    s += 'RTD| %-40s| %-8s| ' % (name, progress)
+    for td in ['kern', 'kthreads', 'user']:
+        t = 't' if td == 'kthreads' else td[0]
+        mark = 'o' if t in tested else '-'
+        filename = os.path.join(directory, 'results-%s-latency.dat' % td)
+        if os.path.isfile(filename):
+            rows = results_lines(filename)
+            line = warmup_line(len(rows))
+            # sequential sums like awk, whose maxima start at 0:
+            n = 0
+            sum1 = 0.0
+            sum2 = 0.0
+            maxd = 0.0
+            ors0 = 0.0
+            ors = 0.0
+            for row in rows[line-1:]:
+                latmin, latmax, overruns = awk_fields(row, [2, 5, 7])
+                if n == 0:
+                    ors0 = overruns
+                d = latmax - latmin
+                sum1 += d
+                sum2 += d*d
+                n += 1
+                maxd = max(maxd, d)
+                ors = max(ors, overruns)
+            if n > 0:
+                mean = sum1/n
+                var = sum2/n - mean*mean
+                s += '%7.0f| %7.0f| %7.0f| %5d| %7d| ' % \
+                    (maxd, mean, m.sqrt(var) if var >= 0 else float('NaN'),
+                     n, int(ors - ors0))
+        else:
+            s += '%7s| %7s| %7s| %5s| %7s| ' % ((mark,)*5)
+        filename = os.path.join(directory, 'results-%s-switches.dat' % td)
+        rows = results_lines(filename, b'SWITCH TIME') if os.path.isfile(filename) else []
+        if len(rows) == 3:
+            for row in rows:
+                # $(NF-1) of whitespace separated fields:
+                fields = row.split()
+                s += '%5.0f| ' % awk_fields(fields[-2] if len(fields) > 1 else row, [1])[0]
+        else:
+            s += '%5s| %5s| %5s| ' % ((mark,)*3)
+        filename = os.path.join(directory, 'results-%s-preempt.dat' % td)
+        if os.path.isfile(filename):
+            rows = results_lines(filename)
+            latmin, latmax, jitfast, jitslow = awk_fields(rows[-1], [2, 4, 5, 6]) \
+                if len(rows) > 0 else [0.0]*4
+            s += '%9.0f| %9.0f| %9.0f| ' % (latmax - latmin, jitfast, jitslow)
+        else:
+            s += '%9s| %9s| %9s| ' % ((mark,)*3)
+    s += 'config-' + report + '\n\n'
+    return s
+
+def summarize(argv):
+    parser = argparse.ArgumentParser(
+        prog='testreport.py summarize',
+        description='Summarize the results-*.dat files of a test run like test_save of makertaikernel.sh.')
+    parser.add_argument('-d', default='.', metavar='DIR', dest='directory',
+                        help='directory with the results-*.dat files (defaults to the current directory)')
+    parser.add_argument('--quality', default=None, metavar='TESTMODE', dest='quality',
+                        help='print the quality of the latency test of %(metavar)s like test_result instead')
+    parser.add_argument('name', nargs='?', default='', help='description of the test')
+    parser.add_argument('report', nargs='?', default='', help='name of the report')
+    parser.add_argument('tested', nargs='?', default='', help='started test modes (k, t, u)')
+    parser.add_argument('progress', nargs='?', default='', help='progress of the tests')
+    args = parser.parse_args(argv)
+    if args.quality is not None:
+        sys.stdout.write(summarize_quality(args.quality, args.directory) + '\n')
+    else:
+        sys.stdout.write(summarize_tests(args.name, args.report, args.tested,
+                                         args.progress, args.directory))
+
+qualities = ['failed', 'bad', 'ok', 'good', 'perfect']
+# exit status of stream if the test was stopped early,
+# differs from the ones of python errors (1) and argparse (2):
+stream_stopped = 3
+
+class LatencyStream:
+    # running statistics of the RTD lines of a latency test after
+    # the warm-up lines and its quality like test_result and test_save.
+    # The quality can only get worse while the test is running.
+
+    def __init__(self, warmup=20):
+        self.warmup = warmup
+        self.lines = 0
+        self.n = 0
+        self.sum1 = 0.0
+        self.sum2 = 0.0
+        self.maxd = 0.0
+        self.ors0 = 0.0
+        self.ors = 0.0
+        self.maxjitter = None
+
+    def add(self, line):
+        # add an output line of the test, returns True for RTD lines:
+        if b'RTD' not in line:
+            return False
+        self.lines += 1
+        if self.lines < self.warmup:
+            return True
+        latmin, latmax, overruns = awk_fields(line, [2, 5, 7])
+        d = latmax - latmin
+        if self.n == 0:
+            self.ors0 = overruns
+            self.maxjitter = d
+        self.n += 1
+        self.sum1 += d
+        self.sum2 += d*d
+        self.maxd = max(self.maxd, d)
+        self.maxjitter = max(self.maxjitter, d)
+        self.ors = overruns
+        return True
+
+    def overruns(self):
+        return int(self.ors - self.ors0)
+
+    def quality(self):
+        if self.n == 0:
+            return None
+        if self.overruns() > 0:
+            return 'failed'
+        latency = int('%.0f' % self.maxjitter)
+        if latency > 20000:
+            return 'bad'
+        if latency > 10000:
+            return 'ok'
+        if latency > 2000:
+            return 'good'
+        return 'perfect'
+
+    def status(self):
+        if self.n == 0:
+            return '%5d lines, warm-up' % self.lines
+        mean = self.sum1/self.n
+        var = self.sum2/self.n - mean*mean
+        return '%5d lines, mean %5.0fns, stdev %5.0fns, max %6.0fns, overruns %d, %s' % \
+            (self.lines, mean, m.sqrt(max(var, 0.0)), self.maxd, self.overruns(),
+             self.quality())
+
+def pipe_writers(fd=0):
+    # other processes that have the pipe of fd open (linux only):
+    try:
+        link = os.readlink('/proc/self/fd/%d' % fd)
+    except OSError:
+        return []
+    if not link.startswith('pipe:'):
+        return []
+    pids = []
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            for pfd in os.listdir('/proc/%s/fd' % pid):
+                if os.readlink('/proc/%s/fd/%s' % (pid, pfd)) == link:
+                    pids.append(int(pid))
+                    break
+        except OSError:
+            pass
+    return pids
+
+def follow_lines(sf, pid=None, timeout=10.0, interval=0.2):
+    # complete lines of a growing file until process pid terminated
+    # or the file did not grow for timeout seconds:
+    partial = b''
+    idle = 0.0
+    while True:
+        line = sf.readline()
+        if line:
+            partial += line
+            if partial.endswith(b'\n'):
+                yield partial
+                partial = b''
+            idle = 0.0
+            continue
+        if pid is not None:
+            try:
+                os.kill(pid, 0)
+            except OSError:
+                break
+        elif idle >= timeout:
+            break
+        time.sleep(interval)
+        idle += interval
+    if partial:
+        yield partial
+
+def stream(argv):
+    import signal
+    parser = argparse.ArgumentParser(
+        prog='testreport.py stream',
+        description='Analyze the RTD lines of a running latency test read from stdin or from a growing file.',
+        epilog='Exits with %d if the test was stopped early.' % stream_stopped)
+    parser.add_argument('-i', default=20, type=int, metavar='LINES', dest='warmup',
+                        help='RTD line from which on the latencies are analyzed (defaults to %(default)s as test_result for tests with at least 60 lines)')
+    parser.add_argument('--stop', default=None, choices=qualities[:-1],
+                        metavar='QUALITY', dest='stop',
+                        help='stop as soon as the quality of the test is %(metavar)s (failed, bad, ok, or good) or worse')
+    parser.add_argument('--signal', nargs='?', default=None, const='INT',
+                        metavar='SIGNAL', dest='signal',
+                        help='on --stop send %(metavar)s (defaults to %(const)s) to the processes writing into stdin or to --pid, and record their output until it ends')
+    parser.add_argument('--pid', default=None, type=int, metavar='PID', dest='pid',
+                        help='process writing the test output, reading a file ends when it terminates')
+    parser.add_argument('--tee', default=None, metavar='FILE', dest='tee',
+                        help='also write the test output to %(metavar)s')
+    parser.add_argument('--timeout', default=10.0, type=float, metavar='SECONDS',
+                        dest='timeout',
+                        help='stop reading a file that did not grow for %(metavar)s (defaults to %(default)ss) if --pid is not given')
+    parser.add_argument('file', nargs='?', default='-',
+                        help='file written by the latency test (defaults to stdin, whose lines are copied to stdout)')
+    args = parser.parse_args(argv)
+
+    echo = args.file == '-'
+    if echo:
+        sf = sys.stdin.buffer
+        lines = sf
+    else:
+        sf = open(args.file, 'rb')
+        lines = follow_lines(sf, args.pid, args.timeout)
+    tf = open(args.tee, 'wb') if args.tee else None
+    live = sys.stderr.isatty()
+    test = LatencyStream(args.warmup)
+    stopped = False
+    try:
+        for line in lines:
+            if tf is not None:
+                tf.write(line)
+                tf.flush()
+            if echo:
+                if live:
+                    sys.stderr.write('\r\033[K')
+                sys.stdout.buffer.write(line)
+                sys.stdout.flush()
+            if stopped or not test.add(line):
+                continue
+            if live:
+                sys.stderr.write('\r\033[K' + test.status())
+                sys.stderr.flush()
+            quality = test.quality()
+            if args.stop is not None and quality is not None and \
+               qualities.index(quality) <= qualities.index(args.stop):
+                stopped = True
+                if args.signal is None:
+                    break
+                # stop the test, but keep its final output:
+                pids = [args.pid] if args.pid is not None else pipe_writers(sf.fileno())
+                for pid in pids:
+                    try:
+                        os.kill(pid, getattr(signal, 'SIG' + args.signal.upper()))
+                    except OSError:
+                        pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if tf is not None:
+            tf.close()
+        if not echo:
+            sf.close()
+    if live:
+        sys.stderr.write('\r\033[K')
+    sys.stderr.write(test.status() + (', stopped' if stopped else '') + '\n')
+    if stopped:
+        sys.exit(stream_stopped)
+
+def percentile_list(value):
+    # comma separated percentiles of a command line argument:
+    try:
+        percentiles = [float(p) for p in value.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError('%r is not a comma separated list of percentiles' % value)
+    for p in percentiles:
+        if not 0.0 <= p <= 100.0:
+            raise argparse.ArgumentTypeError('percentile %g is not between 0 and 100' % p)
+    return percentiles
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'summarize':
+        summarize(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'stream':
+        stream(sys.argv[2:])
+        return
     init = 10
     outlier = 0.0  # percent
     number_cols = None
@@ -769,6 +3024,24 @@ def main():
                         help='number of initial lines to be skipped (defaults to %(default)s)')
     parser.add_argument('-p', default=outlier, type=float, metavar='PERCENT', dest='outlier',
                         help='percentile defining outliers (defaults to %(default)s%%)')
+    parser.add_argument('--sketch', nargs='?', default=None, const=0.01, type=float,
+                        metavar='PRECISION', dest='sketch',
+                        help='analyze latencies from logarithmic histograms with relative error %(metavar)s (defaults to %(const)s) instead of the raw data')
+    parser.add_argument('--tail', nargs='?', default=[], const=[99.0, 99.9, 99.99],
+                        type=percentile_list, metavar='PERCENTILES', dest='tails',
+                        help='add columns with comma separated high %(metavar)s of the latencies (defaults to 99,99.9,99.99)')
+    parser.add_argument('--deadline', default=None, type=float, metavar='NS',
+                        dest='deadline',
+                        help='add column with percentage of latencies exceeding %(metavar)s nanoseconds')
+    parser.add_argument('--spikes', nargs='?', default=None, const=spikes_threshold,
+                        type=float, metavar='NS', dest='spikes',
+                        help='add columns with the number of latencies above %(metavar)s nanoseconds (defaults to %(const)s), the longest burst of consecutive spikes, the median interval between spikes, and the longest burst of overruns')
+    parser.add_argument('--window', default=10, type=int, metavar='LINES',
+                        dest='window',
+                        help='size of the rolling windows of the spike analysis (defaults to %(default)s)')
+    parser.add_argument('--spike-details', default=None, metavar='FILE',
+                        dest='spike_details',
+                        help='write details of the spike analysis including the worst windows of each file to %(metavar)s ("-" for stdout)')
     parser.add_argument('-s', action='append', default=[],
                         type=str, metavar='COLUMN', dest='sort_columns',
                         help='sort results according to %(metavar)s (index or header). Several columns can be specified by repeated -s options. If the first character of %(metavar)s is a ^, then the column is sorted in reversed order.')
@@ -781,6 +3054,9 @@ def main():
     parser.add_argument('--add', action='append', default=[],
                         type=str, metavar='KEY=VALUE', dest='add_cols',
                         help='add a column with header KEY and data value VALUE')
+    parser.add_argument('--group-by', action='append', default=[],
+                        type=str, metavar='COLUMN', dest='group_cols',
+                        help='combine rows with equal values in column %(metavar)s (index or header) into a single row. Several columns can be specified by repeated --group-by options. Counts are summed, means and standard deviations are pooled, maxima and overruns are the maximum of the runs. Without --sketch a percentile column (pNN) is the maximum of the percentiles of the runs, an upper bound of the percentile of the pooled latencies. With --sketch it is the percentile of the merged histograms.')
     parser.add_argument('-f', nargs='?', default=table_format, const='dat', dest='table_format',
                         choices=DataTable.formats,
                         help='output format of summary table (defaults to "%(default)s")')
@@ -791,13 +3067,60 @@ def main():
                         help='add line with column numbers/indices/letters to header')
     parser.add_argument('-m', default='-', dest='missing',
                         help='string used to indicate missing values')
+    parser.add_argument('-j', nargs='?', default=1, const=0, type=int,
+                        metavar='N', dest='jobs',
+                        help='parse files in %(metavar)s parallel processes (all cpus if %(metavar)s is omitted or 0)')
+    parser.add_argument('--no-cache', action='store_const', const=None,
+                        default='use', dest='cache',
+                        help='do not use the cache of parsed files')
+    parser.add_argument('--rebuild-cache', action='store_const', const='rebuild',
+                        dest='cache',
+                        help='parse all files and rebuild the cache')
+    parser.add_argument('--cache-size', default=256, type=float, metavar='MB',
+                        dest='cache_size',
+                        help='maximum size of a cache directory in megabytes (defaults to %(default)s)')
+    parser.add_argument('--watch', default=None, metavar='DIR', dest='watch',
+                        help='watch directory %(metavar)s for new or changed files and update the summary')
+    parser.add_argument('--interval', default=10.0, type=float, metavar='SECONDS',
+                        dest='interval',
+                        help='time between updates of --watch (defaults to %(default)ss)')
+    parser.add_argument('--export', default=None, metavar='FILE', dest='export',
+                        help='save raw data of all files to archive %(metavar)s (*' + archive_extension + ') that can be used as input file')
+    parser.add_argument('--ingest', default=None, metavar='DB', dest='ingest',
+                        help='store the results of all files in the sqlite database %(metavar)s (*.db) that can be used as input file')
+    parser.add_argument('--where', action='append', default=[],
+                        type=str, metavar='CONDITION', dest='where',
+                        help='sql %(metavar)s selecting the reports of database input files, e.g. "kernel = \'4.4.115\' and param like \'%%idle%%\'". Columns are ' + ', '.join(archive_text + archive_numbers) + '. Several conditions can be combined by repeated --where options.')
+    parser.add_argument('--compare', action='append', default=[],
+                        type=str, metavar='BASELINE', dest='compare',
+                        help='compare the latency tests of the files with the ones of the baseline file or directory %(metavar)s (may be repeated) and exit with 1 on regressions. Mean jitter, maximum, tail percentiles (of --tail, defaults to 99,99.9) and overruns are compared on the pooled latencies with bootstrap confidence intervals.')
+    parser.add_argument('--threshold', default=5.0, type=float, metavar='PERCENT',
+                        dest='threshold',
+                        help='a metric of --compare regresses if its confidence interval is above an increase of %(metavar)s (defaults to %(default)s%%)')
+    parser.add_argument('--bootstrap', default=1000, type=int, metavar='N',
+                        dest='bootstrap',
+                        help='number of bootstrap resamples of --compare (defaults to %(default)s)')
+    parser.add_argument('--site', default=None, metavar='DIR', dest='site',
+                        help='write a static html site with an index of all files, a page for each run and trend pages for each configuration to directory %(metavar)s. Only the pages of new or changed files are written.')
     parser.add_argument('-g', nargs='?', default='no', const='show',
                         dest='plots', metavar='FILE',
-                        help='show or save histogram plots to %(metavar)s')
+                        help='show histogram plots or save them to %(metavar)s with the test mode appended to the file name')
+    parser.add_argument('--profile', nargs='?', default=None, const='',
+                        metavar='FILE', dest='profile',
+                        help='print run times and counts of each stage to stderr and optionally save cProfile statistics to %(metavar)s. Parsing and analysis are summed over the files (also of parallel processes) and are part of processing.')
     parser.add_argument('file', nargs='*', default='', type=str,
-                        help='latency-* file with RTAI test results')
+                        help='latency-* file with RTAI test results (may be compressed with gzip, xz or bzip2), or tar or zip file containing latency-* files')
     args = parser.parse_args()
 
+    profile = None
+    profiler = None
+    if args.profile is not None:
+        profile = Profile()
+        if args.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+
     init = args.init
     outlier = args.outlier
     units = 'row' if args.units else 'none'
@@ -807,49 +3130,48 @@ def main():
     hide_cols = args.hide_cols
     select_cols = args.select_cols
     add_cols = args.add_cols
+    group_cols = [s.replace('_', ' ').replace(':', '>') for s in args.group_cols]
     missing = args.missing
     plots = False if args.plots == 'no' else True
     plotfile = args.plots if plots and args.plots != 'show' else None
+    jobs = args.jobs
+    cache = args.cache
 
-    dt = DataTable()
-    dt.add_section('data')
-    add_data = []
-    for a in add_cols:
-        ak, av = a.split('=')
-        dt.add_column(ak, '1', '%-s')
-        add_data.append(av)
-    dt.add_column('num', '1', '%3s')
-    dt.add_column('kernel parameter', '1', '%-5s')
-    dt.add_column('isolcpus', '1', '%-d')
-    dt.add_column('cpu', '1', '%-d')
-    dt.add_column('load', '1', '%-s')
-    dt.add_column('latency', '1', '%-s')
-    dt.add_column('governor', '1', '%-s')
-    dt.add_column('temp', 'C', '%4.1f')
-    dt.add_column('freq', 'GHz', '%5.3f')
-    dt.add_column('poll', '%', '%4.1f')
-    dt.add_column('quality', '1', '%-s')
-    for testmode in ['kern', 'kthreads', 'user']:
-        dt.add_section(testmode+' latencies')
-        dt.add_column('mean jitter', 'ns', '%3.0f')
-        dt.add_column('stdev', 'ns', '%3.0f')
-        dt.add_column('max', 'ns', '%3.0f')
-        dt.add_column('overruns', '1', '%1.0f')
-        dt.add_column('n', 's', '%d')
-        dt.add_section(testmode+' switches')
-        dt.add_column('susp', 'ns', '%3.0f')
-        dt.add_column('sem', 'ns', '%3.0f')
-        dt.add_column('rpc', 'ns', '%3.0f')
-        dt.add_section(testmode+' preempt')
-        dt.add_column('max', 'ns', '%3.0f')
-        dt.add_column('jitfast', 'ns', '%3.0f')
-        dt.add_column('jitslow', 'ns', '%3.0f')
-        dt.add_column('n', '1', '%d')
-    dt.add_section('tests')
-    dt.add_column('test details', '', '%-s')
-    dt.add_column('link', '', '%-s')
+    tails = args.tails
+    deadline = args.deadline
+    export = args.export
+    ingest = args.ingest
+    where = ' and '.join('(%s)' % w for w in args.where)
+    spikes = args.spikes
+    if args.spike_details and spikes is None:
+        spikes = spikes_threshold
+    reader = ReportParser(init=init, outlier=outlier, sketch=args.sketch,
+                          tails=tails, deadline=deadline, spikes=spikes,
+                          window=args.window, reduce=not export, cache=cache,
+                          cache_size=args.cache_size, jobs=jobs, where=where, plots=plots,
+                          timing=profile is not None)
+
+    dt, add_data = setup_table(add_cols, tails, deadline, spikes)
+
+    if args.watch is not None:
+        # sort new rows into the order of file names:
+        if len(sort_columns) == 0:
+            sort_columns = ['tests>test details']
+        render = functools.partial(write_table, df=sys.stdout,
+                                   sort_columns=sort_columns,
+                                   hide_cols=hide_cols, select_cols=select_cols,
+                                   table_format=table_format, units=units,
+                                   number_cols=number_cols, missing=missing,
+                                   group_columns=group_cols)
+        try:
+            watch_reports(args.watch, dt, add_data, reader, args.interval, render)
+        except KeyboardInterrupt:
+            pass
+        return
 
     # list files:
+    if profile is not None:
+        profile.start('discovery')
     files = []
     sort_name = False
     if len(args.file) == 0:
@@ -862,193 +3184,130 @@ def main():
             elif filename == 'max':
                 sort_columns = ['kern latencies>max'] + sort_columns
                 sort_name = True
-            elif os.path.isfile(filename):
-                files.append(filename)
-            elif os.path.isdir(filename):
-                files.extend(sorted(glob.glob(os.path.join(filename, 'latencies-*'))))
             else:
-                print('file "' + filename + '" does not exist.')
+                files.extend(find_reports([filename]))
     if sort_name and len(args.file) == 1 and len(files) == 0:
         files = sorted(glob.glob('latencies-*'))
 
+    if profile is not None:
+        profile.stop('discovery', files=len(files))
+
+    # check the sql condition on databases:
+    for filename in files:
+        if input_type(filename) == 'database':
+            error = check_database(filename, where)
+            if error is not None:
+                sys.stderr.write('%s: %s\n' % (filename, error))
+                sys.exit(2)
+
+    # compare with baseline files:
+    if len(args.compare) > 0:
+        reader = ReportParser(init=init, reduce=False, cache=cache,
+                              cache_size=args.cache_size, jobs=jobs)
+        baseline = list(reader.reports(find_reports(args.compare)))
+        candidate = list(reader.reports(files))
+        dt, regressions = compare_reports(baseline, candidate, init,
+                                          tails if tails else [99.0, 99.9],
+                                          args.threshold, args.bootstrap)
+        if dt.rows() == 0:
+            sys.stderr.write('no latency tests to compare\n')
+            sys.exit(2)
+        write_table(dt, sys.stdout, [], hide_cols, select_cols, table_format,
+                    units, number_cols, missing)
+        if regressions > 0:
+            sys.exit(1)
+        return
+
+    # write html site:
+    if args.site:
+        runs, configs = build_site(args.site, files, reader, dt, add_data)
+        print('%d run pages and %d configuration pages written to %s'
+              % (runs, configs, args.site))
+        return
+
     # common part of file name:
-    common_name = os.path.commonprefix(['-'.join(os.path.basename(f).split('-')[9:]) for f in files])
+    common_name = os.path.commonprefix(['-'.join(os.path.basename(report_name(f)).split('-')[9:]) for f in files])
 
-    if plots:
-        fig = plt.figure(figsize=(5,3.5), dpi=80)
-        ax = fig.add_subplot(1, 1, 1)
-        logbins = np.logspace(2.0, 5.0, 100)
-        #ax.set_title(common_name + ': kern latencies')
-        ax.set_title('kern latencies')
-        ax.set_xscale('log')
-        ax.set_xlabel('Jitter [ns]')
-        ax.set_yscale('log', nonposy='clip')
-        ax.set_ylim(0.5, 1000)
-        ax.set_ylabel('Count')
-                        
     # analyze files:
-    for filename in files:
-        with open(filename) as sf:
-            
-            cpuid = parse_filename(filename, dt)
-
-            # gather test data:
-            intest = False
-            data = {}
-            for line in sf:
-                if 'Loaded modules' in line:
-                    break
-                if 'test:' in line:
-                    intest = True
-                    tests = line.split()[0]
-                    testmode, testtype = tests.split('/')
-                    latencies = []
-                    overruns = []
-                    jitterfast = []
-                    jitterslow = []
-                    switches = []
-                if '------------' in line:
-                    intest = False
-                    if testtype == 'latency':
-                        data[testmode, testtype, 'latencies'] = np.array(latencies)
-                        data[testmode, testtype, 'overruns'] = np.array(overruns)
-                    elif testtype == 'switches':
-                        data[testmode, testtype, 'switches'] = np.array(switches)
-                    elif testtype == 'preempt':
-                        data[testmode, testtype, 'latencies'] = np.array(latencies)
-                        data[testmode, testtype, 'jitterfast'] = np.array(jitterfast)
-                        data[testmode, testtype, 'jitterslow'] = np.array(jitterslow)
-                if intest:
-                    if testtype == 'switches':
-                        if 'SWITCH TIME' in line:
-                            cols = line.split()
-                            switches.append(int(cols[-2]))
-                    else:        
-                        cols = line.split('|')
-                        if cols[0] == 'RTD':
-                            if testtype == 'latency':
-                                latencies.append(int(cols[4])-int(cols[1]))
-                                overruns.append(int(cols[6]))
-                            elif testtype == 'preempt':
-                                latencies.append(int(cols[3])-int(cols[1]))
-                                jitterfast.append(int(cols[4]))
-                                jitterslow.append(int(cols[5]))
-
-            # gather other data:
-            isolcpus = float('NaN')
-            coretemp = float('NaN')
-            cpufreq = float('NaN')
-            poll = float('NaN')
-            inparameter = False
-            inenvironment = False
-            incputopology = False
-            incputemperatures = False
-            for line in sf:
-                if 'Kernel parameter' in line:
-                    inparameter = True
-                if inparameter:
-                    if 'isolcpus' in line:
-                        isolcpus = int(list(filter(str.isdigit, line))[0])
-                    if line.strip() == '':
-                        inparameter = False
-                if 'Environment' in line:
-                    inenvironment = True
-                if inenvironment:
-                    if "tests run on cpu" in line:
-                        cpuid = int(line.split(':')[1].strip())
-                    if line.strip() == '':
-                        inenvironment = False
-                if 'CPU topology' in line:
-                    incputopology = True
-                if incputopology:
-                    if 'cpu%d' % cpuid in line:
-                        cols = line.split()
-                        if len(cols) >= 5:
-                            cpufreq = float(cols[4].strip())
-                            if cpufreq > 1000.0:
-                                cpufreq *= 0.001
-                        if len(cols) >= 9:
-                            poll = float(cols[8].strip().rstrip('%'))
-                    if line.strip() == '':
-                        incputopology = False
-                if 'CPU core temperatures' in line:
-                    incputemperatures = True
-                if incputemperatures:
-                    if 'Core %d' % cpuid in line:
-                        coretemp = float(line.split(':')[1].split()[0].lstrip('+').rstrip('\xc2\xb0C'))
-                    if line.strip() == '':
-                        incputemperatures = False
-
-            # fill table:
-            dt.add_data(add_data, 'data>')
-            dt.add_value(isolcpus, 'data>isolcpus')
-            dt.add_value(cpuid, 'data>cpu')
-            dt.add_value(coretemp, 'data>temp')
-            dt.add_value(cpufreq, 'data>freq')
-            dt.add_value(poll, 'data>poll')
-
-            # analyze:
-            for testmode in ['kern', 'kthreads', 'user']:
-                if (testmode, 'latency', 'latencies') in data:
-                    # analyze latency test:
-                    latencies = data[testmode, 'latency', 'latencies']
-                    overruns = data[testmode, 'latency', 'overruns']
-                    overruns = np.diff(overruns)
-                    dt.add_data(analyze_latencies(latencies[init:], outlier),
-                                testmode+' latencies>mean jitter')
-                    dt.add_data(analyze_overruns(overruns[init:]),
-                                testmode+' latencies>overruns')
-                    if plots:
-                        if len(sort_columns) > 0:
-                            l = ', '.join([dt.key_value(s, -1, missing) for s in sort_columns])
-                        else:
-                            l = '-'.join(os.path.basename(filename).split('-')[9:-1])
-                            l = l.replace(common_name, '')
-                        ax.hist(latencies, logbins, alpha=0.5, label=l)
-                if (testmode, 'switches', 'switches') in data:
-                    # analyze switches test:
-                    dt.add_data(data[testmode, 'switches', 'switches'],
-                                testmode+' switches>susp')
-                if (testmode, 'preempt', 'latencies') in data:
-                    # analyze preempt test:
-                    dt.add_value(data[testmode, 'preempt', 'latencies'][-1],
-                                 testmode+' preempt>max')
-                    dt.add_value(data[testmode, 'preempt', 'jitterfast'][-1],
-                                 testmode+' preempt>jitfast')
-                    dt.add_value(data[testmode, 'preempt', 'jitterslow'][-1],
-                                 testmode+' preempt>jitslow')
-                    dt.add_value(len(data[testmode, 'preempt', 'jitterslow']),
-                                 testmode+' preempt>n')
-            dt.add_value(os.path.basename(filename), 'tests>test details')
-            dt.add_value('[test details](%s)' % os.path.basename(filename), 'tests>links')
-            dt.fill_data()
+    reports = []
+    histograms = [] if args.sketch is not None and len(group_cols) > 0 else None
+    spikes_file = None
+    if args.spike_details:
+        spikes_file = sys.stdout if args.spike_details == '-' else open(args.spike_details, 'w')
+    curves = []
+    if profile is not None:
+        t0 = time.perf_counter()
+    for report in reader.reports(files):
+        if profile is not None:
+            t1 = time.perf_counter()
+            profile.add('processing', t1 - t0, dict(reports=1))
+            for stage, seconds, counts in report.profile:
+                profile.add(stage, seconds, counts)
+        add_report(dt, report, add_data)
+        if histograms is not None:
+            histograms.append(report.histograms)
+        if spikes_file is not None:
+            write_spikes(spikes_file, report, spikes, args.window)
+        if profile is not None:
+            t0 = time.perf_counter()
+            profile.add('table', t0 - t1, dict(rows=1))
+        if export or ingest:
+            reports.append(report)
+        if plots and len(report.plots) > 0:
+            if len(sort_columns) > 0:
+                l = ', '.join([dt.key_value(s, -1, missing) for s in sort_columns])
+            else:
+                l = '-'.join(os.path.basename(report_name(report.filename)).split('-')[9:-1])
+                l = l.replace(common_name, '')
+            curves.append((l, report.plots))
+
+    if spikes_file is not None and spikes_file is not sys.stdout:
+        spikes_file.close()
+
+    # save raw data:
+    if export:
+        if profile is not None:
+            profile.start('export')
+        save_archive(export, reports)
+        if profile is not None:
+            profile.stop('export', reports=len(reports))
+
+    # save results:
+    if ingest:
+        if profile is not None:
+            profile.start('ingest')
+        save_database(ingest, reports)
+        if profile is not None:
+            profile.stop('ingest', reports=len(reports))
 
     # write table keys for makertaikernel.cfg file:
     #dt.write_keys(':', '_')
     #return
                 
     # write results:
-    dt.hide_empty_columns()
-    dt.adjust_columns()
-    dt.sort(sort_columns)
-    for hs in hide_cols:
-        dt.hide(hs.replace('_', ' ').replace(':', '>'))
-    if len(select_cols) > 0:
-        dt.hide_all()
-        for ss in select_cols:
-            dt.show(ss.replace('_', ' ').replace(':', '>'))
-    dt.write(sys.stdout, number_cols=number_cols, table_format=table_format,
-             units=units, missing=missing)
+    if profile is not None:
+        profile.start('rendering')
+    dt = write_table(dt, sys.stdout, sort_columns, hide_cols, select_cols,
+                     table_format, units, number_cols, missing, group_cols,
+                     histograms)
+    if profile is not None:
+        sys.stdout.flush()
+        profile.stop('rendering', rows=dt.rows(),
+                     columns=sum(1 for h in dt.hidden if not h))
 
-    # close plots:
+    # plot histograms:
     if plots:
-        ax.legend()
-        fig.tight_layout()
-        if plotfile is None:
-            plt.show()
-        else:
-            plt.savefig(plotfile)
-            plt.close()
+        if profile is not None:
+            profile.start('plotting')
+        plot_reports(curves, plotfile, jobs)
+        if profile is not None:
+            profile.stop('plotting', curves=len(curves))
+
+    if profile is not None:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        profile.write(sys.stderr)
 
 
 if __name__ == '__main__':